@@ -0,0 +1,116 @@
+import csv
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# One threshold: flag `parameter` whenever `value <op> threshold`
+Rule = namedtuple('Rule', 'parameter op threshold severity message')
+
+# Most severe first; the sidebar badge and the list are ordered this way
+SEVERITIES = ('critical', 'warning')
+
+OPERATORS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+DEFAULT_RULES = [
+    Rule('RBC', '<', 120.0, 'critical', 'RBC below the OJK minimum of 120%'),
+    Rule('Jumlah Ekuitas', '<', 0.0, 'critical', 'Negative equity'),
+    Rule('Jumlah Fraud', '>', 0.0, 'warning', 'Fraud cases reported'),
+]
+
+
+def load_rules(path):
+    """Read rules from a CSV with parameter, op, threshold, severity and message columns"""
+    rules = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['op'] not in OPERATORS:
+                raise ValueError(f"Unknown operator {row['op']!r} for {row['parameter']!r}")
+            if row['severity'] not in SEVERITIES:
+                raise ValueError(f"Unknown severity {row['severity']!r} for {row['parameter']!r}")
+            rules.append(Rule(row['parameter'], row['op'], float(row['threshold']), row['severity'],
+                              row.get('message') or f"{row['parameter']} {row['op']} {row['threshold']}"))
+    return rules
+
+
+# Rules applied to every entity; RISK_ALERT_RULES points at a CSV replacing the defaults
+RULES = load_rules(os.environ['RISK_ALERT_RULES']) if os.environ.get('RISK_ALERT_RULES') else DEFAULT_RULES
+
+
+class AlertTable:
+    """Rule breaches of one ParameterMatrix as a rules x periods boolean array
+
+    Every rule is checked against all periods at once: the rule rows are taken
+    out of the matrix in one fancy index and compared per operator with a
+    broadcast threshold column. Appending a period checks only the new column.
+    Rules whose parameter the matrix does not have are ignored.
+    """
+
+    def __init__(self, matrix, rules=None):
+        rules = RULES if rules is None else rules
+        known = set(matrix.parameters)
+        self.matrix = matrix
+        self.rules = [rule for rule in rules if rule.parameter in known]
+        self._rows = matrix.rows([rule.parameter for rule in self.rules])
+        self._thresholds = np.array([rule.threshold for rule in self.rules], dtype=np.float64)[:, None]
+        self._ops = {op: np.array([rule.op == op for rule in self.rules]) for op in OPERATORS}
+        self.periods = list(matrix.periods)
+        self.breaches = self._evaluate(matrix.values[self._rows])
+        self.breaches.flags.writeable = False
+        # Growable storage, allocated by the first append_period
+        self._buffer = None
+
+    def _evaluate(self, values):
+        """rules x periods breaches of the rule rows' values (NaN never breaches)"""
+        breaches = np.zeros(values.shape, dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for op, selected in self._ops.items():
+                if selected.any():
+                    breaches[selected] = OPERATORS[op](values[selected], self._thresholds[selected])
+        return breaches
+
+    def append_period(self):
+        """Check the matrix's newest period only and add it
+
+        Like ParameterMatrix.append_period, storage grows geometrically, so the
+        breaches of earlier periods are copied only when it fills up.
+        """
+        column = self._evaluate(self.matrix.values[self._rows, -1:])
+        n_periods = self.breaches.shape[1]
+        if self._buffer is None or self._buffer.shape[1] == n_periods:
+            buffer = np.zeros((len(self.rules), max(2 * n_periods, 12)), dtype=bool)
+            buffer[:, :n_periods] = self.breaches
+            self._buffer = buffer
+        self._buffer[:, n_periods:n_periods + 1] = column
+        breaches = self._buffer[:, :n_periods + 1]
+        breaches.flags.writeable = False
+        self.breaches = breaches
+        self.periods.append(self.matrix.periods[-1])
+
+    def counts(self, period_pos=None):
+        """Return {severity: number of breached rules} at a period (the latest by default)"""
+        column = self.breaches[:, -1 if period_pos is None else period_pos] if self.rules else []
+        counts = dict.fromkeys(SEVERITIES, 0)
+        for rule, breached in zip(self.rules, column):
+            counts[rule.severity] += bool(breached)
+        return counts
+
+    def to_frame(self, period_pos=None):
+        """Return the breaches (at one period, or all) as Period / Parameter / Value / Rule / Severity / Message rows"""
+        breaches = self.breaches if period_pos is None else self.breaches[:, period_pos:period_pos + 1]
+        rule_idx, period_idx = np.nonzero(breaches)
+        if period_pos is not None:
+            period_idx = period_idx + period_pos
+        severity_rank = {severity: i for i, severity in enumerate(SEVERITIES)}
+        frame = pd.DataFrame({
+            'Period': [self.periods[i] for i in period_idx],
+            'Parameter': [self.rules[i].parameter for i in rule_idx],
+            'Value': self.matrix.values[self._rows[rule_idx], period_idx] if len(rule_idx) else [],
+            'Rule': [f"{self.rules[i].op} {self.rules[i].threshold:g}" for i in rule_idx],
+            'Severity': [self.rules[i].severity for i in rule_idx],
+            'Message': [self.rules[i].message for i in rule_idx],
+        })
+        # Most severe first, newest period first
+        order = np.lexsort((rule_idx, -period_idx, [severity_rank[s] for s in frame['Severity']]))
+        return frame.iloc[order].reset_index(drop=True)
@@ -0,0 +1,276 @@
+"""Offline month-end reports: one self-contained HTML page per entity and period
+
+    python batch_report.py --from Jan-2025 --to Aug-2025 --output reports --workers 8
+    python batch_report.py --workbook data/Cabang.xlsx --entity Cabang
+
+Pages are built with the same tables, cards and charts as show_dashboard and
+rendered in a process pool. A manifest in the output directory records the
+fingerprint of every page's inputs, so re-runs only render periods whose data
+(or this report's layout) changed.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import data_store
+from charts import gauge_figure, line_figure, portfolio_pie_figure
+from data_model import period_sort_key
+from risk_bands import legend_html
+from sections import (FINANCIAL_TITLES, LINE_TITLES, NON_FINANCIAL_GROUPS, PIE_TITLES, card_deltas,
+                      composite_score, delta_color, financial_card_deltas, financial_cards, non_financial_cards,
+                      summary_display, summary_styler)
+from series import TREND_WINDOW
+
+# Bump when the page layout changes so every page is rendered again
+REPORT_VERSION = 2
+
+MANIFEST_FILE = 'manifest.json'
+
+# Every parameter a page shows
+PAGE_TITLES = FINANCIAL_TITLES + LINE_TITLES + PIE_TITLES + [title for group in NON_FINANCIAL_GROUPS for title in group]
+
+PAGE_STYLE = """
+body { font-family: sans-serif; margin: 24px; color: #333; }
+h1, h2, h3 { color: #1f4788; }
+.row { display: flex; flex-wrap: wrap; gap: 16px; align-items: flex-start; }
+.row > div { flex: 1 1 0; min-width: 280px; }
+.cards { display: flex; flex-wrap: wrap; gap: 8px; }
+.card { flex: 1 1 140px; border: 1px solid #ddd; border-radius: 8px; padding: 8px; text-align: center; }
+.card .title { color: #999; font-size: 12px; }
+.card .value { font-size: 22px; font-weight: bold; margin: 5px 0; }
+.card .delta { font-size: 13px; }
+.card .delta.good { color: #09ab3b; }
+.card .delta.bad { color: #ff2b2b; }
+.financial { background-color: #ADD8E6; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+.non-financial { background-color: #FFFFE0; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; }
+"""
+
+
+def page_path(output, entity, label):
+    return os.path.join(output, entity, f"{label}.html")
+
+
+def period_fingerprint(data, period):
+    """Hash of everything one period's page shows: the trend windows and deltas of the charted and carded
+    parameters and both compared score columns"""
+    digest = hashlib.sha1(f"{REPORT_VERSION}|{data.entity}|{period.label}".encode())
+    # A year and a month back covers the trend window, year-on-year and rolling-mean deltas
+    window = max(TREND_WINDOW, 13)
+    for title in PAGE_TITLES:
+        try:
+            labels, values = data.series.window([title], period.ytd_pos, window)
+        except KeyError:
+            continue
+        digest.update(repr((title, labels)).encode())
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(summary_display(data, period).to_json(orient='split', default_handler=str).encode())
+    return digest.hexdigest()
+
+
+def _delta_class(title, delta):
+    """'good' or 'bad' the way st.metric colours the delta (an increase is bad for inverse cards)"""
+    if not delta:
+        return ''
+    return 'bad' if delta.startswith('-') == (delta_color(title) == 'normal') else 'good'
+
+
+def _cards_html(titles, values, deltas):
+    cards = ''.join(
+        f"<div class='card' title='{html.escape(help_text or '')}'><div class='title'>{html.escape(title)}</div>"
+        f"<div class='value'>{html.escape(str(value))}</div>"
+        f"<div class='delta {_delta_class(title, delta)}'>{html.escape(delta or '')}</div></div>"
+        for title, value, (delta, help_text) in zip(titles, values, deltas)
+    )
+    return f"<div class='cards'>{cards}</div>"
+
+
+def render_page(data, period, plotlyjs='inline'):
+    """Return one period's report as an HTML page"""
+    # plotly.js goes into the first figure only; 'cdn' pages are small but need network access to view
+    include = [True if plotlyjs == 'inline' else 'cdn']
+
+    def figure_html(fig):
+        out = fig.to_html(full_html=False, include_plotlyjs=include[0])
+        include[0] = False
+        return out
+
+    df_summary_display = summary_display(data, period)
+    score = composite_score(df_summary_display)
+    period_pos = period.ytd_pos
+
+    dates, trend_values = data.series.window(LINE_TITLES, period_pos)
+    try:
+        pie_values = data.series.cross_section(PIE_TITLES, period_pos)
+        pie_html = figure_html(portfolio_pie_figure(PIE_TITLES, pie_values.tolist()))
+    except KeyError as e:
+        pie_html = f"<p>Unable to load pie chart data: {html.escape(str(e))}</p>"
+    lines_html = ''.join(
+        f"<div>{figure_html(line_figure(title, dates, trend_values[i]))}</div>" for i, title in enumerate(LINE_TITLES)
+    )
+    non_financial = ''.join(
+        _cards_html(titles, non_financial_cards(data, titles, period_pos), card_deltas(data, titles, period.label))
+        for titles in NON_FINANCIAL_GROUPS
+    )
+    title = f"Risk Management Dashboard - {data.entity} - {period.label}"
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title><style>{PAGE_STYLE}</style></head>
+<body>
+<h1>Risk Management Dashboard</h1>
+<h2>{html.escape(data.entity)} &middot; {html.escape(period.label)}</h2>
+<div>{legend_html()}</div>
+<div class="row">
+<div>{summary_styler(df_summary_display).hide(axis='index').to_html()}</div>
+<div><p style='text-align: center;'><strong>Average Risk</strong><br>Composite Score in {html.escape(period.label)} is {score:.2f}</p>
+{figure_html(gauge_figure(score))}</div>
+</div>
+<div class="financial"><h3>Financial Risks</h3>
+{_cards_html(FINANCIAL_TITLES, financial_cards(data, period_pos), financial_card_deltas(data, period.label))}
+<div class="row"><div><div class="row">{lines_html}</div></div><div>{pie_html}</div></div>
+</div>
+<div class="non-financial"><h3>Non Financial Risk</h3>{non_financial}</div>
+</body></html>
+"""
+
+
+def _init_worker(workbooks):
+    # Workbook entities given on the command line resolve the same way in every worker
+    for entity, path in workbooks:
+        data_store.register_entity(entity, 'path', path)
+
+
+def render_pages(entity, labels, output, plotlyjs):
+    """Worker: write the pages of one entity's periods; returns the labels written"""
+    data = data_store.get_dashboard_data(entity)
+    for label in labels:
+        period = data.periods.for_label(label)
+        path = page_path(output, entity, label)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        page = render_page(data, period, plotlyjs)
+        # Written next to the target and renamed, so a crashed run never leaves half a page
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(page)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return entity, labels
+
+
+def select_periods(data, first=None, last=None):
+    """Periods with scores between first and last (inclusive 'Mon-YYYY' labels)"""
+    low = period_sort_key(first) if first else (0, 0)
+    high = period_sort_key(last) if last else (9999, 12)
+    return [period for period in data.periods.periods
+            if period.score_col is not None and low <= period_sort_key(period.label) <= high]
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output, manifest):
+    path = os.path.join(output, MANIFEST_FILE)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def run(entities, output, first=None, last=None, workers=None, workbooks=(), plotlyjs='inline', force=False,
+        log=print):
+    """Render every stale (entity, period) page; returns {'rendered', 'skipped', 'failed'} counts"""
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output, exist_ok=True)
+    manifest = load_manifest(output)
+    stale = {}
+    fingerprints = {}
+    skipped = 0
+
+    # Fingerprints are cheap compared with rendering, so they are computed up front in this process
+    for entity in entities:
+        data = data_store.get_dashboard_data(entity)
+        seen = manifest.get(entity, {})
+        for period in select_periods(data, first, last):
+            fingerprint = period_fingerprint(data, period)
+            if not force and seen.get(period.label) == fingerprint \
+                    and os.path.exists(page_path(output, entity, period.label)):
+                skipped += 1
+                continue
+            stale.setdefault(entity, []).append(period.label)
+            fingerprints[(entity, period.label)] = fingerprint
+
+    # A few chunks per worker balance the load; each chunk loads its entity once
+    total = sum(len(labels) for labels in stale.values())
+    chunk = max(1, min(12, total // (workers * 4) or 1))
+    tasks = [(entity, labels) for entity, periods in stale.items() for labels in _chunks(periods, chunk)]
+    rendered = failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(list(workbooks),)) as pool:
+        futures = {pool.submit(render_pages, entity, labels, output, plotlyjs): (entity, labels)
+                   for entity, labels in tasks}
+        for future in as_completed(futures):
+            entity, labels = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failed += len(labels)
+                log(f"{entity} {labels[0]}..{labels[-1]}: {e}")
+                continue
+            rendered += len(labels)
+            for label in labels:
+                manifest.setdefault(entity, {})[label] = fingerprints[(entity, label)]
+            # Saved as pages finish, so an interrupted run keeps what it already rendered
+            save_manifest(output, manifest)
+    return {'rendered': rendered, 'skipped': skipped, 'failed': failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entity', action='append', help='entity to report (repeatable; default: all known entities)')
+    parser.add_argument('--workbook', action='append', default=[], help='Data_YTD / Summary workbook to add as an entity')
+    parser.add_argument('--from', dest='first', help="first period, e.g. 'Jan-2025'")
+    parser.add_argument('--to', dest='last', help="last period, e.g. 'Aug-2025'")
+    parser.add_argument('--output', default='reports', help='output directory')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--plotlyjs', choices=['inline', 'cdn'], default='inline',
+                        help='embed plotly.js in every page (self-contained) or load it from the CDN')
+    parser.add_argument('--force', action='store_true', help='render every page even when unchanged')
+    args = parser.parse_args(argv)
+
+    workbooks = []
+    for path in args.workbook:
+        entity = os.path.splitext(os.path.basename(path))[0]
+        path = os.path.abspath(path)
+        data_store.register_entity(entity, 'path', path)
+        workbooks.append((entity, path))
+    entities = args.entity or data_store.list_entities()
+
+    start = time.perf_counter()
+    counts = run(entities, args.output, args.first, args.last, args.workers, workbooks, args.plotlyjs, args.force,
+                 log=lambda message: print(message, file=sys.stderr))
+    print(f"{counts['rendered']} rendered, {counts['skipped']} unchanged, {counts['failed']} failed "
+          f"in {time.perf_counter() - start:.1f} s -> {args.output}")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
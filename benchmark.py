@@ -0,0 +1,271 @@
+"""Benchmarks of the load, rerun and render paths, written out as JSON
+
+    python benchmark.py --parameters 1000 --months 240 --entities 50 --output bench.json
+
+Every result is in milliseconds (min / median / mean / max over the repeats), so
+runs of different releases can be compared key by key.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import alerts
+import charts
+import data_store
+import figure_cache
+import fixed_data
+import sections
+import sqlite_store
+import synthetic_data
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(func, repeat=5, setup=None):
+    """Time func() `repeat` times and return min / median / mean / max in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'repeat': repeat,
+    }
+
+
+def bench_load(results, repeat):
+    results['initialize_fixed_data'] = measure(fixed_data.initialize_fixed_data, repeat)
+    results['fixed_partition_build'] = measure(
+        lambda: data_store.DashboardData.from_frames(*fixed_data.initialize_fixed_data()[:2], version='bench'), repeat
+    )
+
+
+def bench_selection(results, name, data, repeat):
+    """Period resolution and what period_section reads for a selected period, over all periods"""
+    labels = data.periods.labels
+    scored = [period for period in data.periods.periods if period.score_col is not None]
+
+    def resolve_all():
+        for label in labels:
+            data.periods.for_label(label)
+
+    def slice_all():
+        for period in scored:
+            sections.composite_score(sections.summary_display(data, period))
+
+    def cards_all():
+        for period in data.periods.periods:
+            sections.financial_cards(data, period.ytd_pos)
+            sections.financial_card_deltas(data, period.label)
+
+    results[f'{name}.resolve_period_all'] = measure(resolve_all, repeat)
+    results[f'{name}.summary_slice_all'] = measure(slice_all, repeat)
+    results[f'{name}.financial_cards_all'] = measure(cards_all, repeat)
+
+
+def bench_memory(results, name, data):
+    """Bytes of the stored tables against their Excel-shaped (object / float64) equivalents"""
+    report = data.memory_report()
+    results[f'{name}.memory'] = {
+        **report,
+        'summary_ratio': round(report['summary_excel_bytes'] / report['summary_bytes'], 2),
+        'values_ratio': round(report['ytd_excel_bytes'] / report['values_bytes'], 2),
+    }
+
+
+def bench_figures(results, name, data, repeat):
+    """Figure construction and JSON serialization at the latest period"""
+    latest = data.periods.latest
+    titles = ["Jumlah Pendapatan", "Premi Bruto (All)", "Klaim Bruto (All)", "Total Laba (Rugi) Komprehensif"]
+    dates, values = data.series.window(titles, latest.ytd_pos)
+    figures = {
+        'gauge': lambda: charts.gauge_figure(2.5),
+        'line': lambda: charts.line_figure(titles[0], dates, values[0]),
+        'line_full_history': lambda: charts.line_figure(titles[0], *data.series.series(titles[0], latest.ytd_pos,
+                                                                                        len(data.periods))),
+        'pie': lambda: charts.portfolio_pie_figure(titles, values[:, -1].tolist()),
+    }
+    for kind, build in figures.items():
+        results[f'{name}.figure.{kind}.build'] = measure(build, repeat)
+        figure = build()
+        results[f'{name}.figure.{kind}.to_json'] = measure(figure.to_json, repeat)
+
+
+def bench_entities(results, n_entities, n_parameters, n_months):
+    """Generate and register entities, then switch through all of them"""
+    # Keep every generated entity resident so switching measures lookups, not eviction
+    data_store.MAX_PARTITIONS = max(data_store.MAX_PARTITIONS, n_entities + 1)
+    start = time.perf_counter()
+    names = synthetic_data.register_synthetic_entities(n_entities, n_parameters, n_months)
+    build_ms = (time.perf_counter() - start) * 1000
+    results['entities.generate_and_register'] = {
+        'total_ms': round(build_ms, 3), 'per_entity_ms': round(build_ms / max(n_entities, 1), 3),
+        'entities': n_entities,
+    }
+    results['entities.switch_all'] = measure(lambda: [data_store.get_dashboard_data(name) for name in names])
+    # Every threshold rule over every parameter x period of every entity, as done on load
+    matrices = [data_store.get_dashboard_data(name).matrix for name in names]
+    results['entities.alerts_all'] = measure(lambda: [alerts.AlertTable(matrix) for matrix in matrices])
+    return names
+
+
+def bench_sqlite(results, name, data, repeat):
+    """Export to a scratch SQLite file, then the per-view queries against the same reads in memory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = sqlite_store.pool(os.path.join(tmp, 'bench.sqlite'))
+        results[f'{name}.sqlite.export'] = measure(lambda: sqlite_store.export_entity(pool, data, 'bench', ''), 1)
+        results[f'{name}.sqlite.open'] = measure(lambda: sqlite_store.open_entity(pool, data.entity), repeat)
+        stored = sqlite_store.open_entity(pool, data.entity)
+        results[f'{name}.sqlite.resident_bytes'] = {'sqlite': stored.memory_bytes(), 'memory': data.memory_bytes()}
+        for backend, source in (('memory', data), ('sqlite', stored)):
+            latest = source.periods.latest
+            # What one dashboard render reads: cards with deltas, the trend window and the score table
+            results[f'{name}.sqlite.page_reads.{backend}'] = measure(lambda: (
+                sections.financial_cards(source, latest.ytd_pos),
+                sections.financial_card_deltas(source, latest.label),
+                source.series.window(sections.LINE_TITLES, latest.ytd_pos),
+                sections.summary_display(source, latest),
+            ), repeat)
+        sqlite_store.close_pool(pool.path)
+
+
+def bench_app(results, name, entity, repeat):
+    """Full headless script runs: first load of the dashboard page and warm reruns"""
+    from streamlit.testing.v1 import AppTest
+
+    # main.py reads Logo.png relative to the working directory
+    os.chdir(APP_DIR)
+
+    def cold_run():
+        figure_cache.clear()
+        at = AppTest.from_file(os.path.join(APP_DIR, 'main.py'), default_timeout=600)
+        at.session_state.page = 'dashboard'
+        at.session_state.entity = entity
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        return at
+
+    results[f'{name}.app.first_run'] = measure(cold_run, repeat)
+    at = cold_run()
+    results[f'{name}.app.rerun'] = measure(at.run, repeat)
+    labels = data_store.get_dashboard_data(entity).periods.labels
+    date_box = [box for box in at.selectbox if box.label == 'Select Date'][0]
+    results[f'{name}.app.change_date'] = measure(
+        lambda: date_box.select(labels[len(labels) // 2]).run(), 1
+    )
+
+
+COLD_START_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+sys.path.insert(0, os.getcwd())
+at = AppTest.from_file('main.py', default_timeout=600)
+at.run()
+home = time.perf_counter()
+at.session_state.page = 'dashboard'
+at.run()
+print(json.dumps({'home_ms': (home - start) * 1000, 'dashboard_ms': (time.perf_counter() - home) * 1000,
+                  'error': at.exception[0].value if at.exception else None}))
+"""
+
+
+def bench_cold_start(results, repeat):
+    """Fresh interpreter until the home page has rendered, then the first dashboard open"""
+    import subprocess
+
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT], cwd=APP_DIR, capture_output=True,
+                             text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for key in ('home_ms', 'dashboard_ms'):
+        timings = [run[key] for run in runs]
+        results[f'cold_start.{key[:-3]}'] = {
+            'min_ms': round(min(timings), 3),
+            'median_ms': round(statistics.median(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'repeat': repeat,
+        }
+
+
+def environment(args):
+    import plotly
+    import streamlit
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'streamlit': streamlit.__version__,
+        'data_version': data_store.source_version(),
+        'compact_summary': data_store.COMPACT_SUMMARY,
+        'value_dtype': data_store.VALUE_DTYPE.name,
+        'parameters': args.parameters,
+        'months': args.months,
+        'entities': args.entities,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--parameters', type=int, default=1000, help='parameters per synthetic entity')
+    parser.add_argument('--months', type=int, default=240, help='months per synthetic entity')
+    parser.add_argument('--entities', type=int, default=50, help='synthetic entities to generate')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement')
+    parser.add_argument('--skip-app', action='store_true', help='skip the AppTest script runs')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    # The in-memory partitions are measured; bench_sqlite compares them with a scratch SQLite file
+    data_store.SQLITE_PATH = None
+    results = {}
+    bench_load(results, args.repeat)
+    fixed = data_store.get_dashboard_data()
+    bench_selection(results, 'fixed', fixed, args.repeat)
+    bench_memory(results, 'fixed', fixed)
+    bench_figures(results, 'fixed', fixed, args.repeat)
+    bench_sqlite(results, 'fixed', fixed, args.repeat)
+
+    names = bench_entities(results, args.entities, args.parameters, args.months)
+    if names:
+        synthetic = data_store.get_dashboard_data(names[0])
+        bench_selection(results, 'synthetic', synthetic, args.repeat)
+        bench_memory(results, 'synthetic', synthetic)
+        bench_figures(results, 'synthetic', synthetic, args.repeat)
+        bench_sqlite(results, 'synthetic', synthetic, args.repeat)
+
+    if not args.skip_app:
+        bench_cold_start(results, args.repeat)
+        bench_app(results, 'fixed', data_store.DEFAULT_ENTITY, args.repeat)
+        if names:
+            bench_app(results, 'synthetic', names[0], args.repeat)
+
+    report = json.dumps({'environment': environment(args), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        sys.stdout.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
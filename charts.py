@@ -0,0 +1,82 @@
+import plotly.graph_objects as go
+
+from risk_bands import gauge_steps
+
+
+def gauge_figure(value):
+    """Composite score gauge on the 0-5 scale with the band colours"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=value,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        number={'font': {'size': 32}},
+        gauge={
+            'axis': {'range': [None, 5], 'tickwidth': 2},
+            'bar': {'color': "black", 'thickness': 0.3},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'steps': gauge_steps(),
+        }
+    ))
+    fig.update_layout(height=280, margin=dict(l=20, r=20, t=0, b=20))
+    return fig
+
+
+def line_figure(title, dates, values, large=False):
+    """Monthly line chart; `large` is the single-chart tab size, otherwise the 2x2 grid size"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=dates, y=values, mode='lines+markers',
+        name=title, line=dict(width=3 if large else 2), marker=dict(size=8 if large else 6)
+    ))
+    fig.update_layout(
+        title=title, height=450 if large else 250,
+        margin=dict(l=40, r=20, t=40, b=30),
+        xaxis=dict(showgrid=True), yaxis=dict(showgrid=True),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def portfolio_pie_figure(labels, values):
+    """Investment portfolio distribution over all categories"""
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        hole=0.3,
+        textinfo='label+percent',
+        textposition='auto'
+    )])
+    fig.update_layout(
+        title="Distribusi Portfolio Investasi",
+        height=400,
+        margin=dict(l=10, r=10, t=40, b=120),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.4,
+            xanchor="center",
+            x=0.5
+        )
+    )
+    return fig
+
+
+def single_pie_figure(title, value):
+    """Full pie showing one investment type and its amount"""
+    fig = go.Figure(data=[go.Pie(
+        labels=[title],
+        values=[100],  # Full 100% pie
+        hole=0.3,
+        textinfo='label+value',
+        textposition='inside',
+        text=[f"{value}"]
+    )])
+    fig.update_layout(
+        title=f"{title}: {value}",
+        height=450,
+        margin=dict(l=20, r=20, t=40, b=20),
+        showlegend=False
+    )
+    return fig
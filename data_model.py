@@ -0,0 +1,346 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from risk_bands import BAND_LABELS, NO_BAND
+
+FULL_MONTH_NAMES = {
+    'Jan': 'January', 'Feb': 'February', 'Mar': 'March', 'Apr': 'April',
+    'May': 'May', 'Jun': 'June', 'Jul': 'July', 'Aug': 'August',
+    'Sep': 'September', 'Oct': 'October', 'Nov': 'November', 'Dec': 'December'
+}
+MONTH_ABBREVIATIONS = {full: abbr for abbr, full in FULL_MONTH_NAMES.items()}
+
+# Every source column of one period in df_ytd and df_summary
+Period = namedtuple('Period', [
+    'label', 'year', 'month', 'ytd_pos', 'ytd_year_col', 'ytd_data_col',
+    'score_col', 'weighted_col', 'classification_col',
+])
+
+
+class ParameterMatrix:
+    """Numeric parameter x period store, the canonical internal form of Data_YTD
+
+    `values` is a contiguous read-only float64 (or, in compact mode, float32)
+    array (rows = parameters, columns = periods). Header metadata from the Excel
+    layout (year, month and the source column names of every period) lives in `header`.
+    """
+
+    def __init__(self, parameters, values, header, dtype=np.float64):
+        values = np.ascontiguousarray(values, dtype=dtype)
+        if values.shape != (len(parameters), len(header)):
+            raise ValueError(f"values shape {values.shape} does not match "
+                             f"{len(parameters)} parameters x {len(header)} periods")
+        values.flags.writeable = False
+
+        self.parameters = list(parameters)
+        self.values = values
+        self.header = header.reset_index(drop=True)
+        self.periods = self.header['label'].tolist()
+        # Growable storage, allocated by the first append_period
+        self._buffer = None
+        # Parameter name -> row, built once so lookups never depend on workbook row order
+        self._row_pos = {}
+        for i, name in enumerate(self.parameters):
+            self._row_pos.setdefault(name, i)
+
+    def row(self, name):
+        """Return the row of a parameter by name"""
+        try:
+            return self._row_pos[name]
+        except KeyError:
+            raise KeyError(f"Unknown parameter: {name!r}") from None
+
+    def rows(self, names):
+        """Return the rows of several parameters as an index array"""
+        return np.fromiter((self.row(name) for name in names), dtype=np.intp, count=len(names))
+
+    def get(self, name, period_pos):
+        """Return one parameter's value for a period"""
+        return self.values[self.row(name), period_pos]
+
+    def take(self, names, period_pos):
+        """Return many parameters' values for one period in a single vectorized take"""
+        return self.values[self.rows(names), period_pos]
+
+    def append_period(self, header_row, column):
+        """Append one period (values aligned with `parameters`) without rebuilding the matrix
+
+        Storage grows geometrically, so each append costs amortized O(parameters);
+        `values` then becomes a row-strided view of that storage.
+        """
+        column = np.asarray(column, dtype=self.values.dtype)
+        if column.shape != (len(self.parameters),):
+            raise ValueError(f"expected {len(self.parameters)} values, got {column.shape}")
+
+        n_periods = self.values.shape[1]
+        if self._buffer is None or self._buffer.shape[1] == n_periods:
+            buffer = np.empty((len(self.parameters), max(2 * n_periods, 12)), dtype=self.values.dtype)
+            buffer[:, :n_periods] = self.values
+            self._buffer = buffer
+        self._buffer[:, n_periods] = column
+
+        values = self._buffer[:, :n_periods + 1]
+        values.flags.writeable = False
+        # Publish the values before the period so readers never see a period without data
+        self.values = values
+        self.header = pd.concat([self.header, pd.DataFrame([header_row])], ignore_index=True)
+        self.periods.append(header_row['label'])
+
+    def astype(self, dtype):
+        """Return this matrix with values stored as `dtype` (self when it already is)"""
+        if self.values.dtype == dtype:
+            return self
+        return ParameterMatrix(self.parameters, self.values, self.header, dtype=dtype)
+
+    def to_frame(self):
+        """Return the matrix as a float64 DataFrame (parameters x period labels)"""
+        return pd.DataFrame(self.values, index=pd.Index(self.parameters, name='Parameter'),
+                            columns=pd.Index(self.periods, name='Period'))
+
+
+class PeriodLookup:
+    """(year, month) and 'Mon-YYYY' label -> source columns of every period, built once at load time"""
+
+    def __init__(self, matrix, df_summary):
+        # df_summary: 'Unnamed: 0', 'Jenis Risiko', then (year, score, weighted, classification) per month
+        summary_cols = {}
+        columns = list(df_summary.columns)
+        for i in range(2, len(columns) - 3, 4):
+            year_col = columns[i]
+            month = MONTH_ABBREVIATIONS.get(str(year_col).split('-')[0])
+            if month is None:
+                continue
+            year = int(df_summary[year_col].iloc[0])
+            summary_cols[(year, month)] = tuple(columns[i + 1:i + 4])
+
+        self.periods = []
+        self._by_key = {}
+        self._by_label = {}
+        for row in matrix.header.itertuples(index=False):
+            self.append(row._asdict(), summary_cols.get((row.year, row.month), (None, None, None)))
+
+    @classmethod
+    def from_periods(cls, periods):
+        """Index already resolved periods, e.g. read back from a storage backend"""
+        lookup = cls.__new__(cls)
+        lookup.periods = []
+        lookup._by_key = {}
+        lookup._by_label = {}
+        for period in periods:
+            lookup._index(period)
+        return lookup
+
+    def __len__(self):
+        return len(self.periods)
+
+    def append(self, header_row, summary_cols):
+        """Index one more period (a matrix header row and its df_summary columns) in O(1)"""
+        period = Period(header_row['label'], header_row['year'], header_row['month'], len(self.periods),
+                        header_row['year_col'], header_row['data_col'], *summary_cols)
+        return self._index(period)
+
+    def extended(self, header_row, summary_cols):
+        """Return a new lookup with one more period, leaving this one (which sessions may be reading) as is"""
+        lookup = PeriodLookup.from_periods(self.periods)
+        lookup.append(header_row, summary_cols)
+        return lookup
+
+    def _index(self, period):
+        self.periods.append(period)
+        self._by_key[(period.year, period.month)] = period
+        self._by_label[period.label] = period
+        return period
+
+    @property
+    def labels(self):
+        """Return every period label in chronological order"""
+        return [period.label for period in self.periods]
+
+    @property
+    def latest(self):
+        """Return the most recent period, or None when there is no data"""
+        return self.periods[-1] if self.periods else None
+
+    @property
+    def latest_scored(self):
+        """Return the most recent period with Summary scores (Data_YTD may run ahead), or None"""
+        for period in reversed(self.periods):
+            if period.score_col is not None:
+                return period
+        return None
+
+    def get(self, year, month):
+        """Return the period for a year and month abbreviation ('Aug'), or None"""
+        return self._by_key.get((year, month))
+
+    def for_label(self, label):
+        """Return the period of a 'Mon-YYYY' label ('Aug-2025'), or None"""
+        return self._by_label.get(label)
+
+    def previous(self, period):
+        """Return the period before `period`, or None for the first one"""
+        return self.periods[period.ytd_pos - 1] if period.ytd_pos > 0 else None
+
+
+def period_sort_key(label):
+    """Return a (year, month number) key for chronological ordering of 'Mon-YYYY' labels"""
+    month, year = label.split('-')
+    return int(year), list(FULL_MONTH_NAMES).index(month)
+
+
+def month_labels(start, end):
+    """Return consecutive 'Mon-YYYY' labels from `start` to `end` inclusive"""
+    months = list(FULL_MONTH_NAMES)
+    start_year, start_month = period_sort_key(start)
+    end_year, end_month = period_sort_key(end)
+    return [f'{months[i % 12]}-{i // 12}'
+            for i in range(start_year * 12 + start_month, end_year * 12 + end_month + 1)]
+
+
+def summary_comparison(df_summary, previous, period):
+    """Return the Kategori Risiko / previous_month / present_month scores of two periods"""
+    df = df_summary[['Jenis Risiko']].copy()
+    df['previous_month'] = df_summary[previous.score_col] if previous is not None and previous.score_col else '-'
+    df['present_month'] = df_summary[period.score_col]
+    df.columns = ['Kategori Risiko', 'previous_month', 'present_month']
+    return df
+
+
+def _repeat_counts(periods):
+    """Yield (label, month, year, full month, n-th repeat of that month name) for 'Mon-YYYY' labels"""
+    seen = {}
+    for label in periods:
+        month, year = label.split('-')
+        full_month = FULL_MONTH_NAMES[month]
+        count = seen.get(full_month, 0)
+        seen[full_month] = count + 1
+        yield label, month, int(year), full_month, count
+
+
+def summary_columns(periods):
+    """Return (year, score, weighted, classification) df_summary column names for each period"""
+    columns = []
+    for label, month, year, full_month, count in _repeat_counts(periods):
+        # Repeated month names get the same '.N' suffix pandas gives duplicate Excel headers
+        suffix = '' if count == 0 else f'.{count}'
+        columns.append((f'{full_month}-{year}', f'{full_month}-score{suffix}',
+                        f'{full_month}-weighted{suffix}', f'{full_month}-classification{suffix}'))
+    return columns
+
+
+def next_period_columns(header, label):
+    """Return (header row, summary columns) of a period appended after `header`, as period_header and
+    summary_columns would name it over the whole history"""
+    month, year = label.split('-')
+    full_month = FULL_MONTH_NAMES[month]
+    # Earlier periods of the same month name decide the '.N' suffix
+    count = int((header['month'] == month).sum())
+    suffix = '' if count == 0 else f'.{count}'
+    header_row = {
+        'label': label,
+        'year': int(year),
+        'month': month,
+        'year_col': f'{full_month}{suffix}',
+        'data_col': f'Unnamed: {2 * len(header) + 3}',
+    }
+    return header_row, (f'{full_month}-{year}', f'{full_month}-score{suffix}',
+                        f'{full_month}-weighted{suffix}', f'{full_month}-classification{suffix}')
+
+
+def _summary_groups(columns):
+    """Yield the (year, score, weighted, classification) column names of every period in df_summary"""
+    columns = list(columns)
+    for i in range(2, len(columns) - 3, 4):
+        if MONTH_ABBREVIATIONS.get(str(columns[i]).split('-')[0]) is not None:
+            yield tuple(columns[i:i + 4])
+
+
+def compact_summary(df_summary):
+    """Return df_summary with compact dtypes
+
+    Scores and weighted scores become float64 with NaN for '-', classifications
+    int8 band ids (NO_BAND where there is none), years int16 and the text
+    columns categorical. expand_summary restores the Excel-shaped layout.
+    """
+    label_codes = {label: code for code, label in enumerate(BAND_LABELS)}
+    compact = {}
+    for col in df_summary.columns:
+        compact[col] = df_summary[col]
+    for col in ('Unnamed: 0', 'Jenis Risiko'):
+        if col in df_summary.columns:
+            compact[col] = df_summary[col].fillna('').astype(str).astype('category')
+    for year_col, score_col, weighted_col, class_col in _summary_groups(df_summary.columns):
+        compact[year_col] = pd.to_numeric(df_summary[year_col], errors='coerce').fillna(0).astype(np.int16)
+        compact[score_col] = pd.to_numeric(df_summary[score_col], errors='coerce').astype(np.float64)
+        compact[weighted_col] = pd.to_numeric(df_summary[weighted_col], errors='coerce').astype(np.float64)
+        classes = df_summary[class_col]
+        if classes.dtype != np.int8:
+            classes = classes.map(label_codes).fillna(NO_BAND).astype(np.int8)
+        compact[class_col] = classes
+    return pd.DataFrame(compact, index=df_summary.index)
+
+
+def expand_summary(df_summary):
+    """Inverse of compact_summary: '-' for missing scores, band labels for classification codes"""
+    labels = np.array(BAND_LABELS + ['-'], dtype=object)
+    expanded = {col: df_summary[col] for col in df_summary.columns}
+    for col in ('Unnamed: 0', 'Jenis Risiko'):
+        if col in df_summary.columns:
+            expanded[col] = df_summary[col].astype(object)
+    for year_col, score_col, weighted_col, class_col in _summary_groups(df_summary.columns):
+        for col in (score_col, weighted_col):
+            values = df_summary[col]
+            expanded[col] = values.astype(object).where(values.notna(), '-')
+        if df_summary[class_col].dtype == np.int8:
+            expanded[class_col] = pd.Series(labels[df_summary[class_col].to_numpy()], index=df_summary.index)
+    return pd.DataFrame(expanded, index=df_summary.index)
+
+
+def period_header(periods):
+    """Build header metadata for 'Mon-YYYY' period labels in the Excel column layout"""
+    rows = []
+    for i, (label, month, year, full_month, count) in enumerate(_repeat_counts(periods)):
+        # Repeated month names get the same '.N' suffix pandas gives duplicate Excel headers
+        year_col = full_month if count == 0 else f'{full_month}.{count}'
+        rows.append({
+            'label': label,
+            'year': year,
+            'month': month,
+            'year_col': year_col,
+            'data_col': f'Unnamed: {2 * i + 3}',
+        })
+    return pd.DataFrame(rows, columns=['label', 'year', 'month', 'year_col', 'data_col'])
+
+
+def matrix_from_ytd(df_ytd):
+    """Parse an Excel-shaped df_ytd (header row + paired year/data columns) into a ParameterMatrix"""
+    year_cols = df_ytd.columns[2::2]
+    data_cols = df_ytd.columns[3::2]
+
+    # Row 0 carries the header metadata: year in the year column, month abbreviation in the data column
+    header_row = df_ytd.iloc[0]
+    header = pd.DataFrame({
+        'label': [f"{header_row[d]}-{int(header_row[y])}" for y, d in zip(year_cols, data_cols)],
+        'year': [int(header_row[y]) for y in year_cols],
+        'month': [str(header_row[d]) for d in data_cols],
+        'year_col': list(year_cols),
+        'data_col': list(data_cols),
+    })
+
+    values = df_ytd.iloc[1:][list(data_cols)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    return ParameterMatrix(df_ytd['Parameter'].iloc[1:].tolist(), values, header)
+
+
+def matrix_to_ytd(matrix):
+    """Export a ParameterMatrix back to the Excel-shaped df_ytd layout"""
+    n_params = len(matrix.parameters)
+    ytd_data = {
+        'Unnamed: 0': ['No'] + list(range(1, n_params + 1)),
+        'Parameter': ['Parameter'] + matrix.parameters,
+    }
+    for i, period in matrix.header.iterrows():
+        ytd_data[period['year_col']] = [period['year']] + [np.nan] * n_params
+        ytd_data[period['data_col']] = [period['month']] + matrix.values[:, i].tolist()
+    return pd.DataFrame(ytd_data)
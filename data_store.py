@@ -0,0 +1,635 @@
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import fixed_data
+import scoring
+from data_model import (PeriodLookup, compact_summary, expand_summary, matrix_from_ytd, matrix_to_ytd,
+                        next_period_columns, period_sort_key, summary_comparison)
+from risk_bands import NO_BAND
+from scoring import COMPOSITE_ROW, CompositeEngine
+from series import SeriesStore
+
+# Entity shown when a session has not picked one
+DEFAULT_ENTITY = fixed_data.ENTITY_NAME
+
+# Upper bound on entity partitions held in memory at once (least recently used are evicted);
+# 'memory' entities have no source to reload from, so they are kept and not counted
+MAX_PARTITIONS = int(os.environ.get('RISK_MAX_ENTITIES', '8'))
+
+# Storage of the shared tables: numeric summary columns with NaN and int8 band ids
+# unless RISK_COMPACT=0; float32 parameter values only on request, since monetary
+# values beyond ~7 significant digits do not survive float32
+COMPACT_SUMMARY = os.environ.get('RISK_COMPACT', '1') != '0'
+VALUE_DTYPE = np.dtype(os.environ.get('RISK_VALUE_DTYPE', 'float64'))
+
+# SQLite file serving entities with per-view queries instead of whole tables in memory (see sqlite_store)
+SQLITE_PATH = os.environ.get('RISK_SQLITE_PATH') or None
+
+# Code the fixed data and its snapshot are built with; editing any of these files rebuilds the snapshot.
+# Named rather than imported, so hashing them does not import deltas before an entity is loaded
+SOURCE_MODULES = ('fixed_data', 'data_model', 'scoring', 'risk_bands', 'deltas')
+
+# Process-wide cache shared by every Streamlit session (module state survives reruns)
+_lock = threading.Lock()
+# Serializes reading back, changing and exporting entities in the SQLite file
+_export_lock = threading.Lock()
+_partitions = OrderedDict()
+_build_locks = {}
+_entities = {DEFAULT_ENTITY: ('fixed', None)}
+_discovered = {}
+_source_hashes = {}
+_source_paths = []
+_path_keys = {}
+
+
+def frame_fingerprint(*frames):
+    """Return a stable content hash for one or more DataFrames"""
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(repr(list(df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _normalized_text(df):
+    """Render a frame as text with numbers parsed first, so storage dtypes do not change its hash"""
+    text = {}
+    for col in df.columns:
+        numeric = pd.to_numeric(df[col], errors='coerce')
+        text[col] = numeric.astype(str).where(numeric.notna(), df[col].astype(str))
+    return pd.DataFrame(text)
+
+
+def data_fingerprint(matrix, df_summary):
+    """Return a stable content hash of a parameter matrix and its summary table"""
+    digest = hashlib.sha1()
+    digest.update(repr((matrix.parameters, matrix.periods)).encode())
+    digest.update(matrix.values.tobytes())
+    # Workbooks parsed fresh and loaded from the columnar cache store the summary with different dtypes
+    digest.update(frame_fingerprint(_normalized_text(df_summary)).encode())
+    return digest.hexdigest()
+
+
+def source_version():
+    """Return the version key of the fixed data source (explicit version + hash of SOURCE_MODULES)"""
+    if not _source_paths:
+        _source_paths.extend(importlib.util.find_spec(name).origin for name in SOURCE_MODULES)
+    paths = _source_paths
+    # Only re-hash the sources when a file on disk has changed
+    stat_key = tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    source_hash = _source_hashes.get(stat_key)
+    if source_hash is None:
+        digest = hashlib.sha1()
+        for path in paths:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        source_hash = digest.hexdigest()[:12]
+        _source_hashes.clear()
+        _source_hashes[stat_key] = source_hash
+    return f"{fixed_data.DATA_VERSION}-{source_hash}"
+
+
+class DashboardData:
+    """One entity's data, built once per process and shared read-only by every session"""
+
+    def __init__(self, matrix, df_summary, version, df_ytd=None, entity=None, fingerprint=None):
+        self.entity = entity
+        if COMPACT_SUMMARY:
+            df_summary = compact_summary(df_summary)
+        # Numeric parameter x period matrix used by every lookup on the hot path
+        self.matrix = matrix = matrix.astype(VALUE_DTYPE)
+        # Trailing windows / cross-sections of the matrix for charts and cards
+        self.series = SeriesStore(matrix)
+        self.df_summary = df_summary
+        self.version = version
+        # A fingerprint saved with a snapshot of this exact data skips re-hashing it
+        self.fingerprint = fingerprint or data_fingerprint(matrix, df_summary)
+        # (year, month) -> df_ytd / df_summary columns, so resolving a selection is a dict lookup
+        self.periods = PeriodLookup(matrix, df_summary)
+        # Excel-shaped df_ytd is only an export format, built on first access
+        self._df_ytd = df_ytd
+        # Category x period score engine behind `scoring`, built while loading by the score deltas below
+        self._scoring = None
+
+        self._update_latest()
+        # Period-over-period deltas of every parameter and score, read by cards and tables
+        self._update_deltas()
+        self._update_score_deltas()
+        # Threshold rules checked against every parameter and period at once
+        from alerts import AlertTable
+        self.alerts = AlertTable(self.matrix)
+
+    def _update_latest(self, periods=None):
+        # The comparison table is of the latest scored month; Data_YTD may have months Summary has not yet.
+        # The period and its table are swapped in as one tuple, so a reader never pairs one with the other's
+        periods = periods or self.periods
+        latest = periods.latest_scored
+        if latest is None:
+            self._present = (None, None)
+        else:
+            self._present = (latest, summary_comparison(self.df_summary, periods.previous(latest), latest))
+
+    @property
+    def df_summary_present(self):
+        return self._present[1]
+
+    @property
+    def latest_col_ytd_idx(self):
+        latest = self._present[0]
+        return latest.ytd_year_col if latest is not None else None
+
+    def summary_comparison(self, period):
+        """Return the Kategori Risiko / previous_month / present_month table of a period"""
+        latest, present = self._present
+        if period is latest:
+            return present
+        return summary_comparison(self.df_summary, self.periods.previous(period), period)
+
+    def risk_rows(self):
+        """Return the 'Jenis Risiko' rows of the summary table"""
+        return self.df_summary['Jenis Risiko'].astype(str).tolist()
+
+    def period_summary(self, period):
+        """Return the Jenis Risiko / score / weighted rows of one period as numbers (NaN for '-')"""
+        return pd.DataFrame({
+            'Jenis Risiko': self.risk_rows(),
+            'score': pd.to_numeric(self.df_summary[period.score_col], errors='coerce').to_numpy(),
+            'weighted': pd.to_numeric(self.df_summary[period.weighted_col], errors='coerce').to_numpy(),
+        })
+
+    def _update_deltas(self):
+        from deltas import DeltaTable
+        self.deltas = DeltaTable(self.matrix.parameters, self.matrix.periods, self.matrix.values)
+
+    def _update_score_deltas(self):
+        from deltas import DeltaTable
+        engine = self.scoring
+        self.score_deltas = DeltaTable(engine.categories + [COMPOSITE_ROW],
+                                       [period.label for period in self._scored_periods()],
+                                       np.vstack([engine.scores, engine.composite]))
+
+    @classmethod
+    def from_frames(cls, df_ytd, df_summary, version, entity=None):
+        """Build from the Excel-shaped df_ytd and df_summary of initialize_fixed_data"""
+        return cls(matrix_from_ytd(df_ytd), df_summary, version, df_ytd=df_ytd, entity=entity)
+
+    @property
+    def df_ytd(self):
+        if self._df_ytd is None:
+            self._df_ytd = matrix_to_ytd(self.matrix)
+        return self._df_ytd
+
+    @property
+    def scoring(self):
+        """Composite engine over this entity's category scores"""
+        if self._scoring is None:
+            self._scoring = CompositeEngine.from_summary(self.df_summary, self._scored_periods())
+        return self._scoring
+
+    def _scored_periods(self):
+        return [period for period in self.periods.periods if period.score_col is not None]
+
+    def _with_scores(self, summary, periods, positions=None):
+        """Write the engine's score, weighted and classification columns of `periods` into summary"""
+        rows = summary['Jenis Risiko'].astype(str).tolist()
+        scores, weighted, classes = self.scoring.summary_blocks(rows, positions, compact=COMPACT_SUMMARY)
+        summary[[period.score_col for period in periods]] = scores
+        summary[[period.weighted_col for period in periods]] = weighted
+        summary[[period.classification_col for period in periods]] = classes
+        return summary
+
+    def rescore(self, weights=None):
+        """Re-score every period under a weighting policy (category -> weight) in one matrix pass"""
+        self.scoring.set_weights(weights)
+        # Changed columns go on a shallow copy that is swapped in, so readers never see a half-scored table
+        self.df_summary = self._with_scores(self.df_summary.copy(deep=False), self._scored_periods())
+        self._update_latest()
+        self._update_score_deltas()
+        # The scores are a function of the data and the policy, so chaining the policy is enough
+        policy = sorted(self.scoring.policy.items())
+        self.fingerprint = hashlib.sha1(f"{self.fingerprint}|weights|{policy}".encode()).hexdigest()
+
+    def set_period_scores(self, label, scores):
+        """Replace some category scores (category -> score) of one period and recompute only that period"""
+        periods = self._scored_periods()
+        period = self.periods.for_label(label)
+        if period is None or period.score_col is None:
+            raise KeyError(f"No scores for period {label!r}")
+        pos = periods.index(period)
+        column = self.scoring.scores[:, pos].copy()
+        for cat, score in scores.items():
+            column[self.scoring.categories.index(cat)] = score
+        self.scoring.update_period(pos, column)
+        self.df_summary = self._with_scores(self.df_summary.copy(deep=False), [period], [pos])
+        self._update_latest()
+        self._update_score_deltas()
+        self.fingerprint = hashlib.sha1(f"{self.fingerprint}|{label}|{column.tolist()}".encode()).hexdigest()
+
+    def append_period(self, label, values, scores):
+        """Append one month without rebuilding: YTD values by parameter name and scores by risk category
+
+        The matrix, the summary table, the composite engine, the deltas, the alerts
+        and the fingerprint are extended in place. Only the new period is computed;
+        arrays spanning every period grow in buffers that are copied only when they
+        fill up. The period index is swapped in last, so sessions reading meanwhile
+        resolve the new period only once every table has it.
+        """
+        latest = self.periods.latest
+        if latest is not None and period_sort_key(label) <= period_sort_key(latest.label):
+            raise ValueError(f"{label} is not after the latest period {latest.label}")
+
+        column = np.full(len(self.matrix.parameters), np.nan)
+        for name, value in values.items():
+            column[self.matrix.row(name)] = value
+        engine = self.scoring
+        category_scores = np.full(len(engine.categories), np.nan)
+        for cat, score in scores.items():
+            category_scores[engine.categories.index(cat)] = score
+
+        header_row, (year_col, score_col, weighted_col, class_col) = next_period_columns(self.matrix.header, label)
+
+        # New summary columns go on a new frame that is swapped in, added in one concat since
+        # inserting them one by one fragments the frame over many appends
+        n_rows = len(self.df_summary)
+        if COMPACT_SUMMARY:
+            block = {year_col: np.full(n_rows, header_row['year'], dtype=np.int16),
+                     score_col: np.full(n_rows, np.nan), weighted_col: np.full(n_rows, np.nan),
+                     class_col: np.full(n_rows, NO_BAND, dtype=np.int8)}
+        else:
+            block = {year_col: [header_row['year']] * n_rows, score_col: ['-'] * n_rows,
+                     weighted_col: ['-'] * n_rows, class_col: ['-'] * n_rows}
+        summary = pd.concat([self.df_summary, pd.DataFrame(block, index=self.df_summary.index)], axis=1)
+        # Everything below is indexed by period position or label, which the current lookup never
+        # hands out for the new period, so readers keep getting what they did until it is published
+        periods = self.periods.extended(header_row, (score_col, weighted_col, class_col))
+        self.matrix.append_period(header_row, column)
+        self.alerts.append_period()
+        engine.append_period(category_scores)
+        self.df_summary = self._with_scores(summary, [periods.latest], [engine.scores.shape[1] - 1])
+        self.deltas.append_period(label, self.matrix.values[:, -1])
+        self.score_deltas.append_period(label, np.append(engine.scores[:, -1], engine.composite[-1]))
+        self._df_ytd = None
+        self._update_latest(periods)
+        self.periods = periods
+        # Chain the fingerprint instead of re-hashing the whole history
+        self.fingerprint = hashlib.sha1(
+            f"{self.fingerprint}|{label}|{category_scores.tolist()}".encode() + column.tobytes()
+        ).hexdigest()
+
+    def memory_bytes(self):
+        """Approximate memory held by this entity's shared data"""
+        return (self.matrix.values.nbytes + self.deltas.nbytes() + self.score_deltas.nbytes()
+                + int(self.df_summary.memory_usage(deep=True).sum())
+                + (int(self.df_summary_present.memory_usage(deep=True).sum())
+                   if self.df_summary_present is not None else 0)
+                + (int(self._df_ytd.memory_usage(deep=True).sum()) if self._df_ytd is not None else 0))
+
+    def memory_report(self):
+        """Return bytes held by the stored tables next to their Excel-shaped equivalents"""
+        summary = int(self.df_summary.memory_usage(deep=True).sum())
+        values = self.matrix.values.nbytes
+        # Built just for measuring when no session has exported it, so it is not kept resident
+        df_ytd = self._df_ytd if self._df_ytd is not None else matrix_to_ytd(self.matrix)
+        return {
+            'summary_bytes': summary,
+            'summary_excel_bytes': int(expand_summary(self.df_summary).memory_usage(deep=True).sum()),
+            'values_bytes': values,
+            'values_float64_bytes': values // self.matrix.values.itemsize * 8,
+            'ytd_excel_bytes': int(df_ytd.memory_usage(deep=True).sum()),
+        }
+
+
+def workbook_key(source):
+    """Return the cache key of a workbook: parser version + hash of the file content"""
+    import excel_loader
+    if isinstance(source, str):
+        # Paths are re-hashed only when the file on disk changes
+        stat = os.stat(source)
+        stat_key = (source, stat.st_mtime_ns, stat.st_size, excel_loader.PARSER_VERSION)
+        key = _path_keys.get(stat_key)
+        if key is None:
+            key = f"{excel_loader.PARSER_VERSION}-{excel_loader.file_digest(source)}"
+            _path_keys[stat_key] = key
+        return key
+    return f"{excel_loader.PARSER_VERSION}-{excel_loader.file_digest(source)}"
+
+
+def _read_workbook(source, key, progress=None):
+    """Return (matrix, df_summary) from the columnar cache, parsing the workbook only on a miss"""
+    import excel_loader
+    import workbook_cache
+    cached = workbook_cache.load(key)
+    if cached is not None:
+        return cached
+    matrix, df_summary = excel_loader.read_workbook(source, progress=progress)
+    workbook_cache.save(key, matrix, df_summary)
+    return matrix, df_summary
+
+
+def register_entity(name, kind, source=None):
+    """Register where an entity's data comes from: 'fixed', a workbook 'path', a cached workbook 'key',
+    'memory' (built in process, see add_dashboard_data) or 'sqlite' (only in the RISK_SQLITE_PATH file)"""
+    with _lock:
+        _entities[name] = (kind, source)
+
+
+def _file_stamp(path):
+    """(mtime, size) of a file, None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _discover_entities():
+    """Register every workbook in RISK_DATA_DIR as an entity named after its file (no parsing),
+    then every other entity already exported to the SQLite file"""
+    data_dir = os.environ.get('RISK_DATA_DIR')
+    if data_dir and os.path.isdir(data_dir):
+        mtime = os.stat(data_dir).st_mtime_ns
+        if _discovered.get(data_dir) != mtime:
+            for entry in os.scandir(data_dir):
+                stem, ext = os.path.splitext(entry.name)
+                if entry.is_file() and ext.lower() in ('.xlsx', '.xlsm') and not entry.name.startswith('~$'):
+                    with _lock:
+                        _entities.setdefault(stem, ('path', entry.path))
+            _discovered[data_dir] = mtime
+    if SQLITE_PATH:
+        # Committed writes land in the -wal file first, so both files are checked for changes
+        stamp = _file_stamp(SQLITE_PATH), _file_stamp(SQLITE_PATH + '-wal')
+        if _discovered.get(SQLITE_PATH) != stamp:
+            import sqlite_store
+            for name in sqlite_store.stored_entities(sqlite_store.pool(SQLITE_PATH)):
+                with _lock:
+                    _entities.setdefault(name, ('sqlite', None))
+            _discovered[SQLITE_PATH] = stamp
+
+
+def list_entities():
+    """Return the names of all known entities, the default entity first"""
+    _discover_entities()
+    others = sorted(name for name in _entities if name != DEFAULT_ENTITY)
+    return [DEFAULT_ENTITY] + others
+
+
+def _partition_version(kind, source):
+    if kind == 'fixed':
+        return source_version()
+    if kind == 'path':
+        return workbook_key(source)
+    return source
+
+
+def snapshot_key(version):
+    """Cache key of the prebuilt snapshot of the fixed data"""
+    storage = f"{'compact' if COMPACT_SUMMARY else 'excel'}-{VALUE_DTYPE.name}"
+    return f"fixed-{version}-{storage}"
+
+
+def _fixed_partition(entity, version):
+    """Return the fixed data from its columnar snapshot, building and saving the snapshot on a miss"""
+    import workbook_cache
+    cached = workbook_cache.load_with_meta(snapshot_key(version))
+    if cached is not None:
+        matrix, df_summary, extra = cached
+        return DashboardData(matrix, df_summary, version=version, entity=entity, fingerprint=extra.get('fingerprint'))
+    data = DashboardData.from_frames(*fixed_data.initialize_fixed_data()[:2], version=version, entity=entity)
+    workbook_cache.save(snapshot_key(version), data.matrix, data.df_summary, extra={'fingerprint': data.fingerprint})
+    return data
+
+
+def prebuild_snapshot():
+    """Write the fixed data snapshot ahead of time (e.g. while building the container image)"""
+    return _fixed_partition(DEFAULT_ENTITY, source_version())
+
+
+def scoring_policy():
+    """The current weighting policy as stored with exported entities ('' for equal weights)"""
+    return ','.join(f'{key}={value:g}' for key, value in sorted(scoring.CATEGORY_WEIGHTS.items()))
+
+
+def _build_partition(entity, kind, source, version):
+    if kind == 'sqlite':
+        raise KeyError(f"Data for entity {entity!r} is only in a SQLite file and RISK_SQLITE_PATH is not set")
+    if kind == 'fixed':
+        return _fixed_partition(entity, version)
+    if kind == 'path':
+        matrix, df_summary = _read_workbook(source, version)
+    elif kind == 'memory':
+        raise KeyError(f"Data for entity {entity!r} is no longer in memory")
+    else:
+        import workbook_cache
+        cached = workbook_cache.load(source)
+        if cached is None:
+            raise KeyError(f"Data for entity {entity!r} is no longer cached")
+        matrix, df_summary = cached
+    return DashboardData(matrix, df_summary, version=version, entity=entity)
+
+
+def _store_partition(partition_key, data):
+    """Insert into the LRU, dropping older versions of the entity and the least recently used entities
+
+    Entities held only in memory (add_dashboard_data) are never evicted.
+    """
+    with _lock:
+        for key in [key for key in _partitions if key[0] == partition_key[0] and key != partition_key]:
+            del _partitions[key]
+        _partitions[partition_key] = data
+        _partitions.move_to_end(partition_key)
+        reloadable = [key for key in _partitions if _entities.get(key[0], (None,))[0] != 'memory']
+        for key in reloadable[:max(len(reloadable) - MAX_PARTITIONS, 0)]:
+            del _partitions[key]
+
+
+def _scored(data):
+    """Apply the current weighting policy to a freshly built partition"""
+    if scoring.CATEGORY_WEIGHTS:
+        data.rescore()
+    return data
+
+
+def _load_stored(pool, entity):
+    """Read a stored entity back whole into a DashboardData scored under the current policy"""
+    import sqlite_store
+    matrix, df_summary, version, fingerprint = sqlite_store.load_frames(pool, entity)
+    if not COMPACT_SUMMARY:
+        df_summary = expand_summary(df_summary)
+    data = DashboardData(matrix, df_summary, version=version, entity=entity, fingerprint=fingerprint)
+    if sqlite_store.stored_entities(pool)[entity][1] != scoring_policy():
+        data.rescore()
+    return data
+
+
+def _sqlite_partition(entity, kind, source, version):
+    """Serve an entity from the SQLite file, exporting it first when the stored copy is missing or stale
+
+    A copy of older source data is rebuilt from the source. One scored under another
+    weighting policy is read back, re-scored and exported again, which keeps its
+    appended periods and corrected scores.
+    """
+    import sqlite_store
+    pool = sqlite_store.pool(SQLITE_PATH)
+    policy = scoring_policy()
+    with _export_lock:
+        stored = sqlite_store.stored_entities(pool).get(entity)
+        if stored is None and kind == 'sqlite':
+            raise KeyError(f"Data for entity {entity!r} is not in {SQLITE_PATH}")
+        if stored is None or (kind != 'sqlite' and stored[0] != version):
+            sqlite_store.export_entity(pool, _scored(_build_partition(entity, kind, source, version)), version, policy)
+        elif stored[1] != policy:
+            data = _load_stored(pool, entity)
+            sqlite_store.export_entity(pool, data, data.version, policy)
+        return sqlite_store.open_entity(pool, entity)
+
+
+def get_dashboard_data(entity=None):
+    """Return one entity's shared dashboard data, loading it lazily into the bounded LRU
+
+    Raises KeyError for an unknown entity or one whose data can no longer be loaded.
+    """
+    entity = entity or DEFAULT_ENTITY
+    _discover_entities()
+    if entity not in _entities:
+        raise KeyError(f"Unknown entity: {entity!r}")
+    kind, source = _entities[entity]
+    partition_key = (entity, _partition_version(kind, source))
+
+    data = _partitions.get(partition_key)
+    if data is not None:
+        with _lock:
+            if partition_key in _partitions:
+                _partitions.move_to_end(partition_key)
+        return data
+
+    # One loader per partition; sessions asking for other entities are not blocked meanwhile
+    with _lock:
+        build_lock = _build_locks.setdefault(partition_key, threading.Lock())
+    with build_lock:
+        data = _partitions.get(partition_key)
+        if data is None:
+            if SQLITE_PATH and kind != 'memory':
+                data = _sqlite_partition(entity, kind, source, partition_key[1])
+            else:
+                data = _scored(_build_partition(entity, kind, source, partition_key[1]))
+            _store_partition(partition_key, data)
+    with _lock:
+        _build_locks.pop(partition_key, None)
+    return data
+
+
+def load_workbook_data(source, progress=None, entity=None):
+    """Ingest a Data_YTD / Summary workbook once per process and register it as an entity
+
+    Sessions uploading the same file share one parsed copy, keyed by a hash of
+    the file content and the parser version. Parsed workbooks are also kept in
+    the on-disk columnar cache so restarts and other replicas skip Excel parsing.
+    Returns the entity name (the file name without extension by default).
+    """
+    if entity is None:
+        name = source if isinstance(source, str) else getattr(source, 'name', 'Workbook')
+        entity = os.path.splitext(os.path.basename(name))[0]
+
+    if isinstance(source, str):
+        register_entity(entity, 'path', source)
+        get_dashboard_data(entity)
+        return entity
+
+    key = workbook_key(source)
+    partition_key = (entity, key)
+    if partition_key not in _partitions:
+        matrix, df_summary = _read_workbook(source, key, progress=progress)
+        data = DashboardData(matrix, df_summary, version=key, entity=entity)
+        if scoring.CATEGORY_WEIGHTS:
+            data.rescore()
+        _store_partition(partition_key, data)
+    register_entity(entity, 'key', key)
+    return entity
+
+
+def add_dashboard_data(data):
+    """Register an already built DashboardData (e.g. generated data) as an entity held in memory"""
+    register_entity(data.entity, 'memory', data.version)
+    _store_partition((data.entity, data.version), data)
+    return data.entity
+
+
+def _stored(data):
+    """True for an entity served from the SQLite file"""
+    if not SQLITE_PATH:
+        return False
+    import sqlite_store
+    return isinstance(data, sqlite_store.SqliteDashboardData)
+
+
+def _change(entity, change):
+    """Apply `change` to an entity's DashboardData and return the entity as now served
+
+    Entities in memory are changed in place. Ones served from SQLite are read back,
+    changed and exported again, so the change is kept in the file.
+    """
+    data = get_dashboard_data(entity)
+    if not _stored(data):
+        with _lock:
+            change(data)
+        return data
+    import sqlite_store
+    pool = sqlite_store.pool(SQLITE_PATH)
+    with _export_lock:
+        loaded = _load_stored(pool, entity)
+        change(loaded)
+        sqlite_store.export_entity(pool, loaded, loaded.version, scoring_policy())
+        data = sqlite_store.open_entity(pool, entity)
+    kind, source = _entities[entity]
+    _store_partition((entity, _partition_version(kind, source)), data)
+    return data
+
+
+def append_period(entity, label, values, scores):
+    """Append a new month to a loaded entity (see DashboardData.append_period)"""
+    return _change(entity, lambda data: data.append_period(label, values, scores))
+
+
+def set_period_scores(entity, label, scores):
+    """Correct category scores of one period of a loaded entity (see DashboardData.set_period_scores)"""
+    return _change(entity, lambda data: data.set_period_scores(label, scores))
+
+
+def rescore(weights):
+    """Adopt a new category weighting policy and re-score every loaded entity
+
+    Entities in memory are re-scored in place. Loaded entities served from SQLite
+    are re-scored and exported again now; other stored entities are when next
+    requested, since their stored policy no longer matches.
+    """
+    with _lock:
+        scoring.CATEGORY_WEIGHTS = dict(weights)
+        stored = []
+        for partition_key, data in _partitions.items():
+            if _stored(data):
+                stored.append(partition_key)
+            else:
+                data.rescore(weights)
+    for entity, version in stored:
+        kind, source = _entities[entity]
+        _store_partition((entity, version), _sqlite_partition(entity, kind, source, version))
+
+
+def alert_counts():
+    """Return {entity: {severity: breached rules}} at the latest period of every loaded entity"""
+    with _lock:
+        partitions = list(_partitions.items())
+    return {entity: data.alerts.counts() for (entity, _), data in partitions}
+
+
+def shared_data_bytes():
+    """Approximate memory of every loaded entity partition, held once per process"""
+    with _lock:
+        partitions = list(_partitions.values())
+    return sum(data.memory_bytes() for data in partitions)
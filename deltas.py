@@ -0,0 +1,167 @@
+import numpy as np
+
+from data_model import period_sort_key
+
+# Periods averaged for the rolling-mean comparison (the ones before the period itself)
+ROLLING_WINDOW = 3
+
+# Delta kinds held for every row and period
+KINDS = ('mom', 'mom_pct', 'yoy', 'yoy_pct', 'rolling_mean', 'rolling_delta')
+
+# The kinds that are stored; derive() computes the others from them
+BASE_KINDS = ('mom', 'yoy', 'rolling_mean')
+
+
+def year_ago_index(labels):
+    """Return, per period, the position of the same month a year earlier (-1 when it is not in the data)"""
+    position = {period_sort_key(label): i for i, label in enumerate(labels)}
+    return np.array([position.get((year - 1, month), -1) for year, month in map(period_sort_key, labels)],
+                    dtype=np.intp)
+
+
+def _shifted(values, index):
+    """values[:, index] with NaN where index is -1"""
+    shifted = values[:, np.maximum(index, 0)]
+    shifted[:, index < 0] = np.nan
+    return shifted
+
+
+def _pct(delta, base):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = delta / np.abs(base)
+    pct[~np.isfinite(pct)] = np.nan
+    return pct
+
+
+def compute_deltas(values, labels, window=ROLLING_WINDOW):
+    """Return {kind: rows x periods array} for a rows x periods matrix in one vectorized pass
+
+    mom compares with the previous period in the data, yoy with the same month a
+    year earlier and rolling_delta with the mean of the `window` periods before
+    (as many as are present). *_pct are fractions of the absolute base value.
+    """
+    base = _base_deltas(values, labels, window)
+    return {kind: derive(kind, np.asarray(values, dtype=np.float64), base) for kind in KINDS}
+
+
+def _base_deltas(values, labels, window):
+    """mom, yoy and rolling_mean; every other kind is derived from these and the values"""
+    values = np.asarray(values, dtype=np.float64)
+    n_periods = values.shape[1]
+    previous = _shifted(values, np.arange(n_periods) - 1)
+    year_ago = _shifted(values, year_ago_index(labels))
+
+    # Sums of the `window` periods before each period from running totals (column t = total before t)
+    present = ~np.isnan(values)
+    zeros = np.zeros((len(values), 1))
+    sums = np.hstack([zeros, np.cumsum(np.where(present, values, 0.0), axis=1)])
+    counts = np.hstack([zeros, np.cumsum(present, axis=1)])
+    end = np.arange(n_periods)
+    start = np.maximum(end - window, 0)
+    prior_counts = counts[:, end] - counts[:, start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rolling_mean = np.where(prior_counts > 0, (sums[:, end] - sums[:, start]) / prior_counts, np.nan)
+
+    return {'mom': values - previous, 'yoy': values - year_ago, 'rolling_mean': rolling_mean}
+
+
+def derive(kind, values, base):
+    """One delta kind from the values and the base deltas (arrays of the same shape)"""
+    if kind in base:
+        return base[kind]
+    if kind == 'rolling_delta':
+        return values - base['rolling_mean']
+    # mom_pct / yoy_pct: the compared value is the current value minus the delta
+    delta = base[kind[:-len('_pct')]]
+    return _pct(delta, values - delta)
+
+
+class DeltaTable:
+    """MoM, YoY and rolling-mean deltas of named rows over labelled periods, computed once at load
+
+    Lookups are dict lookups plus an array take, so cards and tables never diff
+    values on render. Only mom, yoy and rolling_mean are stored (shared by every
+    session, read-only); the other kinds are derived from them for the rows taken.
+    """
+
+    def __init__(self, names, labels, values, window=ROLLING_WINDOW):
+        self.names = list(names)
+        self.labels = list(labels)
+        self.window = window
+        self._rows = {name: i for i, name in enumerate(self.names)}
+        self._positions = {label: i for i, label in enumerate(self.labels)}
+        self.values = np.asarray(values, dtype=np.float64)
+        self.deltas = _base_deltas(self.values, self.labels, window)
+        for array in self.deltas.values():
+            array.flags.writeable = False
+        # Growable storage, allocated by the first append_period
+        self._buffer = None
+
+    def append_period(self, label, column):
+        """Add a period after the last one, computing the deltas of that period only
+
+        Gives the same arrays as a rebuild over the longer history. Like
+        ParameterMatrix.append_period, storage grows geometrically, so the
+        existing periods are copied only when it fills up.
+        """
+        column = np.asarray(column, dtype=np.float64)
+        n_periods = self.values.shape[1]
+        month, year = label.split('-')
+        year_ago = self._positions.get(f'{month}-{int(year) - 1}')
+        prior = self.values[:, max(n_periods - self.window, 0):]
+        present = ~np.isnan(prior)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling_mean = np.where(present.any(axis=1),
+                                    np.where(present, prior, 0.0).sum(axis=1) / present.sum(axis=1), np.nan)
+        nan = np.full(len(column), np.nan)
+        new = {
+            'mom': column - self.values[:, -1] if n_periods else nan,
+            'yoy': column - self.values[:, year_ago] if year_ago is not None else nan,
+            'rolling_mean': rolling_mean,
+        }
+
+        # One buffer holding the values and every stored kind, filled up to n_periods
+        kinds = list(self.deltas)
+        if self._buffer is None or self._buffer.shape[2] == n_periods:
+            buffer = np.empty((1 + len(kinds), len(column), max(2 * n_periods, 12)))
+            buffer[0, :, :n_periods] = self.values
+            for i, kind in enumerate(kinds, 1):
+                buffer[i, :, :n_periods] = self.deltas[kind]
+            self._buffer = buffer
+        self._buffer[0, :, n_periods] = column
+        for i, kind in enumerate(kinds, 1):
+            self._buffer[i, :, n_periods] = new[kind]
+
+        views = self._buffer[:, :, :n_periods + 1]
+        deltas = {kind: views[i] for i, kind in enumerate(kinds, 1)}
+        for array in deltas.values():
+            array.flags.writeable = False
+        # Arrays first, then the label, so a reader never finds a period without its deltas
+        self.deltas = deltas
+        self.values = views[0]
+        self.labels.append(label)
+        self._positions[label] = n_periods
+
+    def nbytes(self):
+        return sum(array.nbytes for array in self.deltas.values())
+
+    def take(self, names, label, kind='mom'):
+        """Return one kind of delta for several rows at a period, NaN for unknown rows or periods"""
+        pos = self._positions.get(label)
+        rows = np.array([self._rows.get(name, -1) for name in names], dtype=np.intp)
+        if pos is None:
+            return np.full(len(rows), np.nan)
+        index = np.maximum(rows, 0), pos
+        values = self.values[index]
+        out = derive(kind, values, {name: array[index] for name, array in self.deltas.items()})
+        out = np.array(out, dtype=np.float64)
+        out[rows < 0] = np.nan
+        return out
+
+    def get(self, name, label):
+        """Return {kind: value} for one row at a period"""
+        return {kind: float(value) for kind, value in zip(KINDS, self.take_all([name], label)[:, 0])}
+
+    def take_all(self, names, label):
+        """Return a kinds x rows array of every delta kind (in KINDS order) for several rows at a period"""
+        return np.vstack([self.take(names, label, kind) for kind in KINDS])
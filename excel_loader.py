@@ -0,0 +1,143 @@
+import hashlib
+import math
+
+import numpy as np
+import pandas as pd
+
+from data_model import ParameterMatrix
+
+# Bump whenever parsing changes so cached results of older parsers are not reused
+PARSER_VERSION = 1
+
+YTD_SHEET = 'Data_YTD'
+SUMMARY_SHEET = 'Summary'
+
+# Rows are parsed into fixed-size float64 blocks so memory grows with the data, not the workbook DOM
+CHUNK_ROWS = 1024
+PROGRESS_EVERY = 500
+
+
+def file_digest(source):
+    """Return the sha256 of a file path or file-like object, read in chunks"""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def _to_float(value):
+    """Convert a cell value to float, NaN for blanks, '-' and text"""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().replace(',', ''))
+    except ValueError:
+        return math.nan
+
+
+def _column_names(header_cells):
+    """Name header cells the way pandas.read_excel does ('Unnamed: N', '.N' for repeats)"""
+    names = []
+    seen = {}
+    for i, cell in enumerate(header_cells):
+        name = f'Unnamed: {i}' if cell is None or str(cell).strip() == '' else str(cell).strip()
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f'{name}.{count}')
+    return names
+
+
+def read_ytd_sheet(ws, progress=None):
+    """Stream a Data_YTD worksheet row by row into a ParameterMatrix"""
+    rows = ws.iter_rows(values_only=True)
+    try:
+        columns = _column_names(next(rows))
+        header_cells = next(rows)
+    except StopIteration:
+        raise ValueError(f"Sheet '{YTD_SHEET}' has no header rows") from None
+
+    # Columns: No, Parameter, then (year, data) pairs; the second row holds year and month abbreviation
+    year_positions = list(range(2, len(columns) - 1, 2))
+    data_positions = [pos + 1 for pos in year_positions]
+    header = pd.DataFrame({
+        'label': [f"{str(header_cells[d]).strip()}-{int(float(header_cells[y]))}"
+                  for y, d in zip(year_positions, data_positions)],
+        'year': [int(float(header_cells[y])) for y in year_positions],
+        'month': [str(header_cells[d]).strip() for d in data_positions],
+        'year_col': [columns[y] for y in year_positions],
+        'data_col': [columns[d] for d in data_positions],
+    })
+
+    n_periods = len(data_positions)
+    total_rows = ws.max_row or 0
+    parameters = []
+    blocks = []
+    block = np.empty((CHUNK_ROWS, n_periods), dtype=np.float64)
+    filled = 0
+
+    for row_number, row in enumerate(rows, start=3):
+        name = row[1] if len(row) > 1 else None
+        if name is None or str(name).strip() == '':
+            continue
+        parameters.append(str(name).strip())
+        block[filled] = [_to_float(row[pos]) if pos < len(row) else math.nan for pos in data_positions]
+        filled += 1
+        if filled == CHUNK_ROWS:
+            blocks.append(block)
+            block = np.empty((CHUNK_ROWS, n_periods), dtype=np.float64)
+            filled = 0
+
+        if progress is not None and row_number % PROGRESS_EVERY == 0 and total_rows:
+            progress(min(row_number / total_rows, 1.0), f"{YTD_SHEET}: row {row_number:,} of {total_rows:,}")
+
+    blocks.append(block[:filled])
+    return ParameterMatrix(parameters, np.concatenate(blocks), header)
+
+
+def read_summary_sheet(ws):
+    """Read a Summary worksheet (one row per risk category) into df_summary"""
+    rows = ws.iter_rows(values_only=True)
+    try:
+        columns = _column_names(next(rows))
+    except StopIteration:
+        raise ValueError(f"Sheet '{SUMMARY_SHEET}' has no header row") from None
+
+    data = [list(row[:len(columns)]) + [None] * (len(columns) - len(row)) for row in rows]
+    df_summary = pd.DataFrame(data, columns=columns)
+    # Blank text cells read as '' the way initialize_fixed_data writes them
+    text_cols = df_summary.select_dtypes(exclude='number').columns
+    df_summary[text_cols] = df_summary[text_cols].fillna('')
+    return df_summary
+
+
+def read_workbook(source, progress=None):
+    """Read the Data_YTD and Summary sheets of a workbook in read-only streaming mode
+
+    Returns (ParameterMatrix, df_summary). `progress(fraction, message)` is
+    called while Data_YTD is parsed.
+    """
+    # Imported on first parse only; it is slow to import and most starts read the cache
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        for sheet in (YTD_SHEET, SUMMARY_SHEET):
+            if sheet not in wb.sheetnames:
+                raise ValueError(f"Workbook has no '{sheet}' sheet")
+        matrix = read_ytd_sheet(wb[YTD_SHEET], progress=progress)
+        df_summary = read_summary_sheet(wb[SUMMARY_SHEET])
+    finally:
+        wb.close()
+
+    if progress is not None:
+        progress(1.0, "Workbook loaded")
+    return matrix, df_summary
@@ -0,0 +1,72 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Bounds of the process-wide figure cache (least recently used figures are evicted first)
+MAX_FIGURES = int(os.environ.get('RISK_MAX_FIGURES', '256'))
+MAX_BYTES = int(os.environ.get('RISK_FIGURE_CACHE_MB', '32')) * 1024 * 1024
+
+# Estimated JSON size of a figure: the layout and template every figure carries, then each data value
+FIGURE_BYTES = 7 * 1024
+VALUE_BYTES = 12
+DATA_PROPERTIES = ('x', 'y', 'z', 'labels', 'values', 'text')
+
+# (kind, series id, period, data version) -> (figure, estimated serialized size in bytes)
+_lock = threading.Lock()
+_figures = OrderedDict()
+_total_bytes = 0
+
+
+def estimated_size(figure):
+    """Approximate size of a figure's JSON spec, counted from its data arrays
+
+    Serializing just to measure would double the cost of every miss, since
+    Streamlit serializes the figure again to send it.
+    """
+    values = 0
+    for trace in figure.data:
+        for name in DATA_PROPERTIES:
+            array = getattr(trace, name, None)
+            if array is not None and not isinstance(array, str):
+                values += len(array)
+    return FIGURE_BYTES + VALUE_BYTES * values
+
+
+def get_figure(kind, series_id, period, version, build):
+    """Return the cached figure for the key, calling build() only on a miss
+
+    Cached figures are shared by every session and must not be modified.
+    """
+    global _total_bytes
+    key = (kind, series_id, period, version)
+    with _lock:
+        entry = _figures.get(key)
+        if entry is not None:
+            _figures.move_to_end(key)
+            return entry[0]
+
+    figure = build()
+    # Size of the JSON spec sent to the browser, which is what the figure costs to hold and ship
+    size = estimated_size(figure)
+    with _lock:
+        if key not in _figures:
+            _figures[key] = (figure, size)
+            _total_bytes += size
+        while _figures and (len(_figures) > MAX_FIGURES or _total_bytes > MAX_BYTES):
+            _, (_, evicted_size) = _figures.popitem(last=False)
+            _total_bytes -= evicted_size
+    return figure
+
+
+def stats():
+    """Return the number of cached figures and their total estimated serialized size"""
+    with _lock:
+        return {'figures': len(_figures), 'bytes': _total_bytes}
+
+
+def clear():
+    """Drop every cached figure"""
+    global _total_bytes
+    with _lock:
+        _figures.clear()
+        _total_bytes = 0
@@ -0,0 +1,210 @@
+"""JSON KPI service over the dashboard's shared data, for systems that poll the numbers
+
+    python kpi_api.py --port 8502
+
+    GET /entities                                   known entities
+    GET /periods?entity=Perusahaan                  period labels, oldest first
+    GET /kpis?entity=Perusahaan&period=Jan-2025     KPIs of one period (latest scored by default)
+
+Responses carry an ETag derived from the data fingerprint; a request with a
+matching If-None-Match gets 304 without the payload being built or sent.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import data_store
+from deltas import KINDS
+from risk_bands import band_labels
+from scoring import COMPOSITE_ROW
+from sections import FINANCIAL_TITLES, NON_FINANCIAL_GROUPS, financial_cards
+
+# Bump when the payload layout changes so clients holding old ETags get the new shape
+API_VERSION = 2
+
+# Paths answered per entity; anything else is a 404 before any entity data is loaded
+ENTITY_PATHS = ('/periods', '/kpis')
+
+# Serialized responses kept per (path, entity, period, fingerprint), least recently used evicted first
+MAX_RESPONSES = int(os.environ.get('RISK_API_CACHE', '512'))
+
+_lock = threading.Lock()
+_responses = OrderedDict()
+
+
+def _number(value):
+    """float for JSON, None for missing values"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _deltas(table, names, label):
+    """Precomputed deltas of several rows as one {kind: value} dict per row"""
+    values = np.round(table.take_all(names, label), 6)
+    return [{kind: _number(value) for kind, value in zip(KINDS, column)} for column in values.T]
+
+
+def kpi_payload(data, period):
+    """Return the KPIs shown by the dashboard at one period as a JSON-ready dict"""
+    summary = data.period_summary(period)
+    rows = summary['Jenis Risiko'].tolist()
+    scores = summary['score'].to_numpy()
+    weighted = summary['weighted'].to_numpy()
+    classes = band_labels(scores, missing=None)
+    score_deltas = dict(zip(rows, _deltas(data.score_deltas, rows, period.label)))
+    categories = [
+        {'category': row, 'score': _number(scores[i]), 'weighted': _number(weighted[i]), 'classification': classes[i],
+         'deltas': score_deltas[row]}
+        for i, row in enumerate(rows) if row not in ('', COMPOSITE_ROW)
+    ]
+
+    period_pos = period.ytd_pos
+    try:
+        financial_values = data.series.cross_section(FINANCIAL_TITLES, period_pos)
+    except KeyError:
+        financial_values = [None] * len(FINANCIAL_TITLES)
+    financial = [
+        {'title': title, 'value': _number(value), 'display': display, 'deltas': deltas}
+        for title, value, display, deltas in zip(FINANCIAL_TITLES, financial_values, financial_cards(data, period_pos),
+                                                 _deltas(data.deltas, FINANCIAL_TITLES, period.label))
+    ]
+    non_financial = []
+    for titles in NON_FINANCIAL_GROUPS:
+        for title, deltas in zip(titles, _deltas(data.deltas, titles, period.label)):
+            try:
+                value = data.series.cross_section([title], period_pos)[0]
+            except KeyError:
+                value = None
+            non_financial.append({'title': title, 'value': _number(value), 'deltas': deltas})
+
+    # The composite score and its deltas both come from the composite row
+    composite = [scores[i] for i, row in enumerate(rows) if row == COMPOSITE_ROW]
+    previous = data.periods.previous(period)
+    return {
+        'entity': data.entity,
+        'period': period.label,
+        'previous_period': previous.label if previous is not None else None,
+        'composite_score': _number(composite[0]) if composite else None,
+        'composite_deltas': score_deltas.get(COMPOSITE_ROW),
+        'categories': categories,
+        'financial': financial,
+        'non_financial': non_financial,
+    }
+
+
+def etag(*parts):
+    return '"' + hashlib.sha1('|'.join(map(str, (API_VERSION,) + parts)).encode()).hexdigest()[:20] + '"'
+
+
+def resolve(path, query):
+    """Return (status, etag, build) for a request; build() returns the JSON-ready body"""
+    entity = query.get('entity', [None])[0]
+    if path == '/entities':
+        entities = data_store.list_entities()
+        return 200, etag(path, entities), lambda: {'entities': entities}
+    if path not in ENTITY_PATHS:
+        return 404, None, lambda: {'error': f"Unknown path {path!r}"}
+
+    try:
+        data = data_store.get_dashboard_data(entity)
+    except KeyError as e:
+        message = str(e.args[0])
+        return 404, None, lambda: {'error': message}
+
+    if path == '/periods':
+        return 200, etag(path, data.entity, data.fingerprint), lambda: {'entity': data.entity,
+                                                                       'periods': data.periods.labels}
+    label = query.get('period', [None])[0]
+    period = data.periods.for_label(label) if label else data.periods.latest_scored
+    if period is None or period.score_col is None:
+        return 404, None, lambda: {'error': f"No scores for period {label!r}"}
+    return 200, etag(path, data.entity, period.label, data.fingerprint), lambda: kpi_payload(data, period)
+
+
+def cached_body(key, build):
+    """Return the serialized body for key, building it only on a miss"""
+    with _lock:
+        body = _responses.get(key)
+        if body is not None:
+            _responses.move_to_end(key)
+            return body
+    body = json.dumps(build(), ensure_ascii=False).encode('utf-8')
+    with _lock:
+        _responses[key] = body
+        while len(_responses) > MAX_RESPONSES:
+            _responses.popitem(last=False)
+    return body
+
+
+class KpiHandler(BaseHTTPRequestHandler):
+    server_version = 'RiskKPI/1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        # Building the payload can fail too, so it is inside the try and answered with a JSON 500
+        try:
+            status, tag, build = resolve(path, parse_qs(url.query))
+            not_modified = tag is not None and tag in [t.strip() for t in
+                                                       self.headers.get('If-None-Match', '').split(',')]
+            # Error bodies are small and not cached
+            body = (None if not_modified else cached_body(tag, build) if tag is not None
+                    else json.dumps(build()).encode('utf-8'))
+        except Exception as e:
+            status, tag, not_modified = 500, None, False
+            body = json.dumps({'error': str(e)}).encode('utf-8')
+
+        if not_modified:
+            self.send_response(304)
+            self.send_header('ETag', tag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if tag is not None:
+            self.send_header('ETag', tag)
+            # Clients may keep the body but must revalidate, which is a 304 while the data is unchanged
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if os.environ.get('RISK_API_LOG') == '1':
+            super().log_message(format, *args)
+
+
+def serve(host='127.0.0.1', port=8502):
+    server = ThreadingHTTPServer((host, port), KpiHandler)
+    server.daemon_threads = True
+    print(f"KPI API on http://{host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.environ.get('RISK_API_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('RISK_API_PORT', '8502')))
+    args = parser.parse_args(argv)
+    serve(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,8 @@
+import profiling
 import streamlit as st
 import os
-import pandas as pd
-import numpy as np
-from dashboard import show_dashboard
-from fixed_data import initialize_fixed_data
+from data_store import alert_counts, get_dashboard_data, load_workbook_data, shared_data_bytes
+from utils import format_bytes, session_state_bytes
 
 # Page configuration
 st.set_page_config(page_title="Risk Management Dashboard", layout="wide")
@@ -116,47 +115,48 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
+# Initialize session state - selection only; the data itself is shared by every session (see data_store)
 if 'page' not in st.session_state:
     st.session_state.page = 'menu'
-if 'df_ytd' not in st.session_state:
-    st.session_state.df_ytd = None
-if 'df_summary' not in st.session_state:
-    st.session_state.df_summary = None
-if 'df_summary_present' not in st.session_state:
-    st.session_state.df_summary_present = None
 if 'uploaded_file' not in st.session_state:
     st.session_state.uploaded_file = None
-if 'latest_col_ytd_idx' not in st.session_state:
-    st.session_state.latest_col_ytd_idx = None
-if 'latest_col_idx' not in st.session_state:
-    st.session_state.latest_col_idx = None
+if 'entity' not in st.session_state:
+    st.session_state.entity = None
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 
+# Time this run's sections when the sidebar debug toggle is on
+profiling.start_run(st.session_state.get('debug_timings', False))
+
 # Auto-load fixed data on first run
-if not st.session_state.data_loaded:
-    try:
-        # Initialize fixed data - returns a tuple
-        df_ytd, df_summary, df_summary_present, latest_col_idx, latest_col_ytd_idx = initialize_fixed_data()
-
-        # Store in session state
-        st.session_state.df_ytd = df_ytd
-        st.session_state.df_summary = df_summary
-        st.session_state.df_summary_present = df_summary_present
-        st.session_state.latest_col_idx = latest_col_idx
-        st.session_state.latest_col_ytd_idx = latest_col_ytd_idx
-        st.session_state.data_loaded = True
-
-    except Exception as e:
-        # Show error for debugging
-        st.session_state.load_error = str(e)
+with profiling.span("load data"):
+    if not st.session_state.data_loaded:
+        try:
+            # A configured workbook is loaded from the columnar cache when it has been parsed before
+            if st.session_state.entity is None and os.environ.get('RISK_WORKBOOK_PATH'):
+                st.session_state.entity = load_workbook_data(os.environ['RISK_WORKBOOK_PATH'])
+
+            # Shared data of the session's entity, built once per process
+            get_dashboard_data(st.session_state.entity)
+            st.session_state.data_loaded = True
+
+        except Exception as e:
+            # Show error for debugging
+            st.session_state.load_error = str(e)
+
+def alert_badge(label, icon, color, fallback):
+    """Show an alert count as a badge, or with `fallback` (st.error etc.) on Streamlit before 1.44"""
+    if hasattr(st, 'badge'):
+        st.badge(label, icon=icon, color=color)
+    else:
+        fallback(label)
+
 
 def main():
     """Main function to control navigation"""
 
     # Sidebar navigation
-    with st.sidebar:
+    with profiling.span("sidebar"), st.sidebar:
         st.image("Logo.png")
 
         st.title("Navigation")
@@ -166,7 +166,7 @@ def main():
             st.rerun()
 
         if st.button("📊 View Dashboard", use_container_width=True):
-            if st.session_state.df_ytd is not None and st.session_state.df_summary_present is not None:
+            if st.session_state.data_loaded:
                 st.session_state.page = 'dashboard'
                 st.rerun()
             else:
@@ -176,11 +176,55 @@ def main():
 
         # Data status
         st.subheader("Data Status")
-        if st.session_state.df_ytd is not None and st.session_state.df_summary is not None:
+        if st.session_state.data_loaded:
             st.success("✅ Data loaded")
         else:
             st.warning("⚠️ No data loaded")
 
+        # Threshold breaches of the session's entity in its latest period (checked once at load)
+        if st.session_state.data_loaded:
+            try:
+                entity_alerts = get_dashboard_data(st.session_state.entity).alerts.counts()
+            except KeyError:
+                entity_alerts = {}
+            critical, warning = entity_alerts.get('critical', 0), entity_alerts.get('warning', 0)
+            if critical:
+                alert_badge(f"{critical} critical alert{'s' if critical > 1 else ''}", ":material/error:", "red",
+                            st.error)
+            if warning:
+                alert_badge(f"{warning} warning{'s' if warning > 1 else ''}", ":material/warning:", "orange",
+                            st.warning)
+            if entity_alerts and not critical and not warning:
+                alert_badge("No alerts", ":material/check:", "green", st.success)
+
+            # Other loaded entities (subsidiaries) breaching a critical rule
+            others = [entity for entity, counts in alert_counts().items()
+                      if counts['critical'] and entity != st.session_state.entity]
+            if others:
+                st.caption(f"Critical alerts also in loaded entities: {', '.join(others)}")
+
+        # Upload a Data_YTD / Summary workbook as an entity (parsed once per process in streaming mode)
+        uploaded = st.file_uploader("Upload workbook", type=["xlsx", "xlsm"])
+        if uploaded is not None and (uploaded.name, uploaded.size) != st.session_state.uploaded_file:
+            progress_bar = st.progress(0.0, text="Reading workbook...")
+            try:
+                entity = load_workbook_data(
+                    uploaded, progress=lambda fraction, message: progress_bar.progress(fraction, text=message)
+                )
+                st.session_state.entity = entity
+                st.session_state.uploaded_file = (uploaded.name, uploaded.size)
+                st.session_state.data_loaded = True
+            except Exception as e:
+                st.error(f"Could not read workbook: {e}")
+            progress_bar.empty()
+
+        # What this session holds vs. the data shared by all sessions
+        st.caption(f"Session state: {format_bytes(session_state_bytes(st.session_state))} · "
+                   f"shared data: {format_bytes(shared_data_bytes())}")
+
+        # Per-rerun timing breakdown, filled in once the page has rendered
+        timing_slot = st.container() if st.toggle("Show timings", key="debug_timings") else None
+
     # Main content area
     if st.session_state.page == 'menu':
         st.title("🏠 Risk Management System")
@@ -188,7 +232,7 @@ def main():
         st.write("")
 
         # Auto-navigate to dashboard if data is loaded
-        if st.session_state.df_ytd is not None and st.session_state.df_summary_present is not None:
+        if st.session_state.data_loaded:
             if st.button("📊 View Dashboard", use_container_width=True, key="menu_dashboard"):
                 st.session_state.page = 'dashboard'
                 st.rerun()
@@ -198,7 +242,19 @@ def main():
                 st.error(f"Load Error: {st.session_state.load_error}")
 
     elif st.session_state.page == 'dashboard':
-        show_dashboard()
+        with profiling.span("dashboard"):
+            # Plotly and the chart code are imported the first time the dashboard is opened
+            from dashboard import show_dashboard
+            show_dashboard()
+
+    first_paint_ms = profiling.mark_first_paint()
+    run = profiling.finish_run()
+    if timing_slot is not None and run is not None:
+        with timing_slot:
+            st.caption(f"Last run: {run['total_ms']:.1f} ms · first paint: {first_paint_ms:.0f} ms after start")
+            st.dataframe(profiling.breakdown(run), hide_index=True, use_container_width=True)
+            st.download_button("Export spans (JSON lines)", profiling.to_jsonl(run),
+                               file_name=f"spans-{run['run_id']}.jsonl", mime="application/x-ndjson")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,7 @@
+"""Build the startup snapshot ahead of time (e.g. in the container image): python prebuild.py"""
+import data_store
+import workbook_cache
+
+if __name__ == '__main__':
+    data = data_store.prebuild_snapshot()
+    print(f"Snapshot {data_store.snapshot_key(data.version)} written to {workbook_cache.CACHE_DIR}")
@@ -0,0 +1,114 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Append every recorded run here as JSON lines when set
+SPAN_LOG = os.environ.get('RISK_SPAN_LOG')
+
+# Reference point for time to first paint: when the app first imported this module
+APP_START = time.perf_counter()
+_first_paint_ms = None
+
+# Spans of the script run executing on this thread (each Streamlit run has its own thread)
+_local = threading.local()
+_NO_SPAN = contextlib.nullcontext()
+_log_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+class _Span:
+    __slots__ = ('name', 'run', 'start', 'depth')
+
+    def __init__(self, name, run):
+        self.name = name
+        self.run = run
+
+    def __enter__(self):
+        self.depth = self.run['_depth']
+        self.run['_depth'] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.run['_depth'] -= 1
+        self.run['spans'].append({
+            'name': self.name,
+            'depth': self.depth,
+            'start_ms': round((self.start - self.run['_start']) * 1000, 3),
+            'duration_ms': round((end - self.start) * 1000, 3),
+        })
+        return False
+
+
+def start_run(enabled):
+    """Start collecting spans for the current script run (a no-op unless enabled)"""
+    if not enabled:
+        _local.run = None
+        return
+    _local.run = {
+        'run_id': uuid.uuid4().hex[:12],
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'spans': [],
+        '_depth': 0,
+        '_start': time.perf_counter(),
+    }
+
+
+def span(name):
+    """Context manager timing one section; returns a shared null context when timing is off"""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return _NO_SPAN
+    return _Span(name, run)
+
+
+def finish_run():
+    """Stop collecting and return the run ({run_id, timestamp, total_ms, spans}), or None when off"""
+    run = getattr(_local, 'run', None)
+    _local.run = None
+    if run is None:
+        return None
+    result = {
+        'run_id': run['run_id'],
+        'timestamp': run['timestamp'],
+        'total_ms': round((time.perf_counter() - run['_start']) * 1000, 3),
+        # Spans close innermost first; report them in the order they started
+        'spans': sorted(run['spans'], key=lambda s: s['start_ms']),
+    }
+    if SPAN_LOG:
+        with _log_lock, open(SPAN_LOG, 'a') as f:
+            f.write(to_jsonl(result))
+    return result
+
+
+def to_jsonl(run):
+    """Return one JSON line per span, each carrying the run id and timestamp"""
+    return ''.join(
+        json.dumps({'run_id': run['run_id'], 'timestamp': run['timestamp'], **s}) + '\n'
+        for s in run['spans']
+    )
+
+
+def breakdown(run):
+    """Return the spans of a run as a Section / ms table, nested sections indented"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Section': [' ' * s['depth'] + s['name'] for s in run['spans']],
+        'ms': [s['duration_ms'] for s in run['spans']],
+    })
+
+
+def mark_first_paint():
+    """Record the time from app start to the end of the first script run; later calls return it unchanged"""
+    global _first_paint_ms
+    if _first_paint_ms is None:
+        _first_paint_ms = round((time.perf_counter() - APP_START) * 1000, 1)
+        logger.info("First paint %.0f ms after app start", _first_paint_ms)
+    return _first_paint_ms
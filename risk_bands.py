@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Inclusive upper bound of each band on the 1-5 risk score scale; the table, the gauge,
+# the legend and the classification columns all read these
+BAND_THRESHOLDS = np.array([1.79, 2.59, 3.39, 4.19, 5.0])
+BAND_LABELS = ['Low', 'Low to Moderate', 'Moderate', 'Moderate to High', 'High']
+BAND_COLORS = ['#90d050', '#fff2cc', '#ffff00', '#ffc001', '#ff0000']
+
+# Band id of missing, non-numeric ('-') and out-of-range scores
+NO_BAND = -1
+
+
+def _as_float(scores):
+    """Return scores as a float64 array, NaN for anything non-numeric"""
+    values = np.asarray(scores)
+    if values.dtype.kind in 'fiu':
+        return values.astype(np.float64, copy=False)
+    return pd.to_numeric(pd.Series(values.ravel()), errors='coerce').to_numpy(dtype=np.float64).reshape(values.shape)
+
+
+def band_ids(scores):
+    """Map a whole array of scores to band ids 0-4 in one call (NO_BAND for missing or > 5)"""
+    values = _as_float(scores)
+    ids = np.searchsorted(BAND_THRESHOLDS, values, side='left')
+    # NaN sorts after every threshold, so it lands in the out-of-range slot too
+    return np.where(ids == len(BAND_THRESHOLDS), NO_BAND, ids)
+
+
+def band_labels(scores, missing='-'):
+    """Map scores to band labels ('Low' ... 'High'), `missing` where there is no band"""
+    # NO_BAND (-1) indexes the trailing `missing` entry
+    return np.array(BAND_LABELS + [missing], dtype=object)[band_ids(scores)]
+
+
+def band_styles(scores):
+    """Return one CSS background per score, for Styler.apply on a whole column"""
+    return np.array([f'background-color: {color}' for color in BAND_COLORS] + [''], dtype=object)[band_ids(scores)]
+
+
+def gauge_steps(maximum=5):
+    """Return Plotly gauge steps covering 0-`maximum` with the band colours"""
+    lower_bounds = np.concatenate([[0], BAND_THRESHOLDS[:-1]])
+    upper_bounds = np.concatenate([BAND_THRESHOLDS[:-1], [maximum]])
+    return [
+        {'range': [float(lower), float(upper)], 'color': color}
+        for lower, upper, color in zip(lower_bounds, upper_bounds, BAND_COLORS)
+    ]
+
+
+def legend_html():
+    """Return the horizontal legend markup for the bands"""
+    items = ''.join(
+        f'<span><span style="color: {color}; font-size: 20px;">●</span> {label}</span>'
+        for label, color in zip(BAND_LABELS, BAND_COLORS)
+    )
+    return f'<div style="display: flex; justify-content: space-around; align-items: center;">{items}</div>'
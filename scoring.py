@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from risk_bands import band_ids, band_labels
+
+# Summary row holding the average over all risk categories
+COMPOSITE_ROW = 'Composite Score'
+
+# Weight of every category (and of the composite row) without an explicit entry
+DEFAULT_WEIGHT = 0.8
+
+# Weighting policy: category name -> weight, applied to the weighted columns and to the composite
+CATEGORY_WEIGHTS = {}
+
+
+def weight_vector(categories, weights=None):
+    """Return one weight per category, DEFAULT_WEIGHT where the policy has no entry"""
+    weights = CATEGORY_WEIGHTS if weights is None else weights
+    return np.array([weights.get(cat, DEFAULT_WEIGHT) for cat in categories], dtype=np.float64)
+
+
+class CompositeEngine:
+    """Categories x periods risk scores with weighted and composite scores computed as matrix operations
+
+    With equal weights the composite is the plain average of the categories; with a
+    weighting policy it is the weighted average. Missing scores (NaN) are skipped.
+    """
+
+    def __init__(self, categories, scores, weights=None):
+        self.categories = list(categories)
+        self.scores = np.array(scores, dtype=np.float64).reshape(len(self.categories), -1)
+        self.set_weights(weights)
+
+    @classmethod
+    def from_summary(cls, df_summary, periods, weights=None):
+        """Build from the category rows of df_summary for the given periods"""
+        rows = df_summary['Jenis Risiko'].astype(str)
+        is_category = (rows != '') & (rows != COMPOSITE_ROW)
+        score_cols = [period.score_col for period in periods]
+        block = df_summary.loc[is_category.to_numpy(), score_cols]
+        scores = block.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        return cls(rows[is_category].tolist(), scores, weights=weights)
+
+    def set_weights(self, weights=None):
+        """Apply a weighting policy and re-score every period at once"""
+        self.policy = dict(CATEGORY_WEIGHTS if weights is None else weights)
+        self.weights = weight_vector(self.categories, self.policy)
+        self.composite_weight = self.policy.get(COMPOSITE_ROW, DEFAULT_WEIGHT)
+        self.weighted = np.round(self.scores * self.weights[:, None], 2)
+        self.composite = self._composite(self.scores)
+        self.composite_weighted = np.round(self.composite * self.composite_weight, 2)
+        # Growable storage of all four arrays, allocated by the next append_period
+        self._buffer = None
+
+    def _composite(self, scores):
+        present = ~np.isnan(scores)
+        # Weighted average over the categories present in each period
+        total = np.where(present, scores, 0.0).T @ self.weights
+        weight_sum = present.T.astype(np.float64) @ self.weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.round(total / weight_sum, 2)
+
+    def update_period(self, pos, scores):
+        """Replace one period's category scores and recompute only that period"""
+        column = np.asarray(scores, dtype=np.float64)
+        self.scores[:, pos] = column
+        self.weighted[:, pos] = np.round(column * self.weights, 2)
+        self.composite[pos] = self._composite(column[:, None])[0]
+        self.composite_weighted[pos] = round(self.composite[pos] * self.composite_weight, 2)
+
+    def append_period(self, scores):
+        """Add one period of category scores at the end
+
+        Like ParameterMatrix.append_period, storage grows geometrically, so the
+        earlier periods are copied only when it fills up.
+        """
+        n_categories, n_periods = self.scores.shape
+        if self._buffer is None or self._buffer.shape[1] == n_periods:
+            # Rows: scores, weighted, composite, composite_weighted
+            buffer = np.empty((2 * n_categories + 2, max(2 * n_periods, 12)))
+            buffer[:n_categories, :n_periods] = self.scores
+            buffer[n_categories:2 * n_categories, :n_periods] = self.weighted
+            buffer[-2, :n_periods] = self.composite
+            buffer[-1, :n_periods] = self.composite_weighted
+            self._buffer = buffer
+        self._buffer[:, n_periods] = np.nan
+        views = self._buffer[:, :n_periods + 1]
+        self.scores = views[:n_categories]
+        self.weighted = views[n_categories:2 * n_categories]
+        self.composite = views[-2]
+        self.composite_weighted = views[-1]
+        self.update_period(n_periods, scores)
+
+    def summary_blocks(self, rows, positions=None, compact=False):
+        """Return (scores, weighted, classification) rows x periods object arrays laid out like df_summary
+
+        Category rows carry their scores, the composite row the composite score and
+        any other row (the blank separator) '-'. With `compact` the blocks are
+        float arrays with NaN and int8 band ids instead (see compact_summary).
+        """
+        positions = slice(None) if positions is None else positions
+        index = {cat: i for i, cat in enumerate(self.categories)}
+        n_periods = len(np.arange(self.scores.shape[1])[positions])
+        scores = np.full((len(rows), n_periods), np.nan)
+        weighted = np.full((len(rows), n_periods), np.nan)
+        for i, row in enumerate(rows):
+            if row in index:
+                scores[i] = self.scores[index[row], positions]
+                weighted[i] = self.weighted[index[row], positions]
+            elif row == COMPOSITE_ROW:
+                scores[i] = self.composite[positions]
+                weighted[i] = self.composite_weighted[positions]
+        if compact:
+            return scores, weighted, band_ids(scores).astype(np.int8)
+        return _with_dashes(scores), _with_dashes(weighted), band_labels(scores)
+
+
+def _with_dashes(values):
+    """Return a float array as Python floats with '-' in place of NaN, like the Summary sheet"""
+    out = values.astype(object)
+    out[np.isnan(values)] = '-'
+    return out
+
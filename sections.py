@@ -0,0 +1,152 @@
+"""Tables and card values of the dashboard sections, shared by show_dashboard and the offline reports"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from deltas import KINDS, ROLLING_WINDOW
+from risk_bands import band_styles
+from utils import format_number, format_percentages, format_values, null_value
+
+# Financial cards: six amounts and RBC
+FINANCIAL_TITLES = ["Jumlah Aset", "Jumlah Utang", "Jumlah Ekuitas", "Jumlah Polis", "Kas dan Bank", "Aset Investasi", "RBC"]
+
+# Rupiah per Data_YTD amount unit. The workbook does not state its unit; the fixed data's amounts
+# (Jumlah Aset 8,500-9,700) are read as millions of rupiah, which puts the cards at the miliar scale
+# the hard-coded cards showed before they followed the data. Set RISK_AMOUNT_UNIT=1 for workbooks in rupiah
+AMOUNT_UNIT = float(os.environ.get('RISK_AMOUNT_UNIT', '1000000'))
+
+# Multipliers turning the first six financial cards into rupiah; Jumlah Polis is a count
+CARD_UNITS = np.array([AMOUNT_UNIT, AMOUNT_UNIT, AMOUNT_UNIT, 1, AMOUNT_UNIT, AMOUNT_UNIT])
+
+# Trend charts and portfolio allocation
+LINE_TITLES = ["Jumlah Pendapatan", "Premi Bruto (All)", "Klaim Bruto (All)", "Total Laba (Rugi) Komprehensif"]
+PIE_TITLES = ["Deposito Berjangka", "Obligasi Korporasi", "Surat Berharga yang Diterbitkan oleh Negara RI", "Reksa Dana"]
+
+# Non-financial cards in three columns; titles are the parameter names in Data_YTD
+NON_FINANCIAL_GROUPS = [
+    ["Jumlah Pengaduan", "Indak Lanjut Pengaduan", "Jumlah Pemberitaan Negatif Dalam 1 Tahun"],
+    ["Jumlah Fraud", "Jumlah Gugatan", "Jumlah Nominal Gugatan Yang Sedang Diajukan"],
+    ["Jumlah Pelanggaran Atas Ketentuan", "Jumlah Denda"],
+]
+
+# Cards where an increase is bad news, so their deltas are coloured the other way round
+INVERSE_DELTAS = {
+    "Jumlah Utang", "Klaim Bruto (All)", "Jumlah Pengaduan", "Jumlah Pemberitaan Negatif Dalam 1 Tahun",
+    "Jumlah Fraud", "Jumlah Gugatan", "Jumlah Nominal Gugatan Yang Sedang Diajukan",
+    "Jumlah Pelanggaran Atas Ketentuan", "Jumlah Denda",
+}
+
+
+def summary_display(data, period):
+    """Return the previous / present month comparison table of a period (the latest scored one by default)
+    with the precomputed score change, or None when the entity has no scores at all"""
+    if period is None or period.score_col is None:
+        period = data.periods.latest_scored
+        if period is None:
+            return None
+    display = data.summary_comparison(period)
+    change = data.score_deltas.take(display['Kategori Risiko'].astype(str), period.label)
+    # Scores have two decimals; rounding drops float noise and + 0.0 turns -0.0 into 0.0
+    return display.assign(change=np.round(change, 2) + 0.0)
+
+
+def summary_styler(df_summary_display):
+    """Band-coloured Styler of the category rows with scores to 2 decimals"""
+    # Format only numeric columns to 2 decimal places
+    format_dict = {}
+    for col in df_summary_display.columns:
+        if col in ['previous_month', 'present_month']:
+            format_dict[col] = lambda x: f'{x:.2f}' if pd.notna(x) and isinstance(x, (int, float)) else '-'
+        elif col == 'change':
+            format_dict[col] = lambda x: f'{x:+.2f}' if pd.notna(x) else '-'
+
+    # Band colours for a whole column in one vectorized call
+    return df_summary_display[:9].style.apply(
+        band_styles,
+        subset=['previous_month', 'present_month']
+    ).format(
+        format_dict
+    ).set_properties(
+        **{'text-align': 'center'}
+    ).set_table_styles([
+        {'selector': 'th', 'props': [('text-align', 'center')]}
+    ])
+
+
+def composite_score(df_summary_display):
+    """Composite score of the present month, 0.0 when the table has none"""
+    try:
+        return float(df_summary_display['present_month'].iloc[10])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return 0.0
+
+
+def financial_cards(data, period_pos):
+    """Return the formatted financial card values at a period, in FINANCIAL_TITLES order"""
+    # All card values in one take; amounts are in AMOUNT_UNIT rupiah and RBC in percent
+    try:
+        card_values = data.series.cross_section(FINANCIAL_TITLES, period_pos)
+    except KeyError:
+        card_values = np.zeros(len(FINANCIAL_TITLES))
+    return list(format_values(card_values[:6] * CARD_UNITS)) + list(format_percentages(card_values[6:] / 100))
+
+
+def non_financial_cards(data, titles, period_pos):
+    """Return the formatted values of one group of non-financial cards"""
+    # One vectorized take per card group instead of one lookup per card
+    try:
+        values = data.series.cross_section(titles, period_pos) if period_pos is not None else [0] * len(titles)
+    except KeyError:
+        values = [0] * len(titles)
+    return [format_number(null_value(value)) for value in values]
+
+
+def _delta_texts(values, style, units):
+    """Unsigned delta magnitudes formatted like the card values"""
+    magnitudes = np.abs(np.nan_to_num(values)) * units
+    if style == 'amount':
+        return list(format_values(magnitudes))
+    if style == 'points':
+        return [f"{value:.2f} pp" for value in magnitudes]
+    return [format_number(value) for value in magnitudes]
+
+
+def _signed(text, value, pct=np.nan):
+    text = f"{'-' if value < 0 else '+'}{text}"
+    return text if np.isnan(pct) else f"{text} ({pct:+.1%})"
+
+
+def card_deltas(data, titles, period_label, style='count', units=1):
+    """Return (delta, help) per card from the precomputed deltas, for st.metric
+
+    delta is the change on the previous period (None when there is none), help
+    the year-on-year change and the change on the mean of the periods before.
+    `style` formats like the card values: 'amount', 'count' or 'points' (percent values).
+    """
+    deltas = dict(zip(KINDS, data.deltas.take_all(titles, period_label)))
+    texts = {kind: _delta_texts(deltas[kind], style, units) for kind in ('mom', 'yoy', 'rolling_delta')}
+    pct = (lambda kind, i: np.nan) if style == 'points' else (lambda kind, i: deltas[f'{kind}_pct'][i])
+    cards = []
+    for i in range(len(titles)):
+        mom = deltas['mom'][i]
+        delta = None if np.isnan(mom) else _signed(texts['mom'][i], mom, pct('mom', i))
+        notes = []
+        if not np.isnan(deltas['yoy'][i]):
+            notes.append(f"Year on year: {_signed(texts['yoy'][i], deltas['yoy'][i], pct('yoy', i))}")
+        if not np.isnan(deltas['rolling_delta'][i]):
+            notes.append(f"Against the {ROLLING_WINDOW}-month mean: "
+                         f"{_signed(texts['rolling_delta'][i], deltas['rolling_delta'][i])}")
+        cards.append((delta, '  \n'.join(notes) or None))
+    return cards
+
+
+def financial_card_deltas(data, period_label):
+    """card_deltas of the financial cards: amounts in AMOUNT_UNIT rupiah, Jumlah Polis a count, RBC in points"""
+    return (card_deltas(data, FINANCIAL_TITLES[:6], period_label, 'amount', CARD_UNITS)
+            + card_deltas(data, FINANCIAL_TITLES[6:], period_label, 'points'))
+
+
+def delta_color(title):
+    """st.metric delta_color of a card"""
+    return 'inverse' if title in INVERSE_DELTAS else 'normal'
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Months shown by the trend charts, ending at the selected period
+TREND_WINDOW = 12
+
+# Cached slices per data set (least recently used are evicted first)
+MAX_SLICES = 256
+
+
+def _row_index(rows):
+    """Return a slice for consecutive ascending rows (so numpy returns a view), else the index array"""
+    if len(rows) and np.array_equal(rows, np.arange(rows[0], rows[0] + len(rows))):
+        return slice(int(rows[0]), int(rows[0]) + len(rows))
+    return rows
+
+
+class SeriesStore:
+    """Trailing windows and cross-sections of a ParameterMatrix, cached per (parameters, period, window)
+
+    Slices are taken straight out of the matrix: a single parameter or a run of
+    consecutive parameters comes back as a read-only view, other selections as
+    one fancy-indexed copy. Periods never change once added, so cached slices
+    stay valid when later periods are appended.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self._lock = threading.Lock()
+        self._slices = OrderedDict()
+
+    def _cached(self, key, build):
+        with self._lock:
+            result = self._slices.get(key)
+            if result is not None:
+                self._slices.move_to_end(key)
+                return result
+        result = build()
+        with self._lock:
+            self._slices[key] = result
+            while len(self._slices) > MAX_SLICES:
+                self._slices.popitem(last=False)
+        return result
+
+    def window(self, names, period_pos, window=TREND_WINDOW):
+        """Return (period labels, parameters x periods values) of the `window` periods ending at period_pos"""
+        names = tuple(names)
+
+        def build():
+            start = max(0, period_pos - window + 1)
+            rows = _row_index(self.matrix.rows(names))
+            values = self.matrix.values[rows, start:period_pos + 1]
+            # Shared by every session
+            values.flags.writeable = False
+            return self.matrix.periods[start:period_pos + 1], values
+
+        return self._cached(('window', names, period_pos, window), build)
+
+    def series(self, name, period_pos, window=TREND_WINDOW):
+        """Return (period labels, values) of one parameter's trailing window (a view of the matrix)"""
+        labels, values = self.window([name], period_pos, window)
+        return labels, values[0]
+
+    def cross_section(self, names, period_pos):
+        """Return the values of several parameters at one period"""
+        names = tuple(names)
+
+        def build():
+            values = self.matrix.values[_row_index(self.matrix.rows(names)), period_pos]
+            values.flags.writeable = False
+            return values
+
+        return self._cached(('cross_section', names, period_pos), build)
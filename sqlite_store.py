@@ -0,0 +1,510 @@
+"""Optional SQLite backend: entities stored cell by cell, read per view instead of held in memory
+
+    RISK_SQLITE_PATH=risk.sqlite streamlit run main.py
+    python sqlite_store.py --db risk.sqlite --workbook data/Cabang.xlsx
+
+With RISK_SQLITE_PATH set, data_store exports every entity it loads into the
+file (once per data version) and serves it through SqliteDashboardData, which
+queries only the cells the current view needs: one period's cards, a few
+parameters' trailing windows, two score columns of the summary. Cells are keyed
+by (entity, parameter, period), so each of those is an index lookup or a short
+range scan. Appending a period, correcting scores and re-scoring read the
+entity back into a DashboardData (load_frames), change it there and export it
+again, so in this mode such changes are kept until the source data changes.
+"""
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import alerts
+from data_model import ParameterMatrix, Period, PeriodLookup, compact_summary, period_header
+from deltas import BASE_KINDS, KINDS, derive
+from risk_bands import NO_BAND
+from series import TREND_WINDOW
+
+# Connections kept open per database file (each is used by one thread at a time)
+POOL_SIZE = int(os.environ.get('RISK_SQLITE_POOL', '4'))
+
+# Bump when the tables change; a file written with another layout is refused rather than rewritten
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    entity_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    version TEXT NOT NULL,
+    policy TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS periods (
+    entity_id INTEGER NOT NULL,
+    period_pos INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    ytd_year_col TEXT,
+    ytd_data_col TEXT,
+    summary_year_col TEXT,
+    score_col TEXT,
+    weighted_col TEXT,
+    classification_col TEXT,
+    PRIMARY KEY (entity_id, period_pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS parameters (
+    entity_id INTEGER NOT NULL,
+    parameter_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (entity_id, parameter_id)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS parameters_by_name ON parameters (entity_id, name);
+CREATE TABLE IF NOT EXISTS cells (
+    entity_id INTEGER NOT NULL,
+    parameter_id INTEGER NOT NULL,
+    period_pos INTEGER NOT NULL,
+    value REAL,
+    mom REAL,
+    yoy REAL,
+    rolling_mean REAL,
+    PRIMARY KEY (entity_id, parameter_id, period_pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS summary_rows (
+    entity_id INTEGER NOT NULL,
+    row_pos INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    number TEXT,
+    PRIMARY KEY (entity_id, row_pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS summary (
+    entity_id INTEGER NOT NULL,
+    period_pos INTEGER NOT NULL,
+    row_pos INTEGER NOT NULL,
+    score REAL,
+    weighted REAL,
+    classification INTEGER,
+    mom REAL,
+    yoy REAL,
+    rolling_mean REAL,
+    PRIMARY KEY (entity_id, period_pos, row_pos)
+) WITHOUT ROWID;
+"""
+TABLES = ('entities', 'periods', 'parameters', 'cells', 'summary_rows', 'summary')
+
+# Name lists are bound as one JSON parameter, so each query is a single prepared statement whatever the list length
+CELLS_AT = """
+SELECT p.name, c.value, c.mom, c.yoy, c.rolling_mean
+FROM parameters p JOIN cells c
+  ON c.entity_id = p.entity_id AND c.parameter_id = p.parameter_id AND c.period_pos = ?
+WHERE p.entity_id = ? AND p.name IN (SELECT value FROM json_each(?))
+"""
+CELLS_BETWEEN = """
+SELECT p.name, c.period_pos, c.value
+FROM parameters p JOIN cells c
+  ON c.entity_id = p.entity_id AND c.parameter_id = p.parameter_id AND c.period_pos BETWEEN ? AND ?
+WHERE p.entity_id = ? AND p.name IN (SELECT value FROM json_each(?))
+"""
+KNOWN_PARAMETERS = """
+SELECT name FROM parameters WHERE entity_id = ? AND name IN (SELECT value FROM json_each(?))
+"""
+SUMMARY_AT = """
+SELECT r.name, s.score, s.weighted, s.mom, s.yoy, s.rolling_mean
+FROM summary_rows r LEFT JOIN summary s
+  ON s.entity_id = r.entity_id AND s.row_pos = r.row_pos AND s.period_pos = ?
+WHERE r.entity_id = ?
+ORDER BY r.row_pos
+"""
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """At most `size` connections to one database file, handed out one thread at a time
+
+    The sqlite3 module keeps a cache of prepared statements per connection, so
+    reusing connections with fixed SQL text reuses the prepared statements too.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.closed = False
+        with self.connection() as conn:
+            found = conn.execute('PRAGMA user_version').fetchone()[0]
+            if found != SCHEMA_VERSION:
+                if conn.execute('SELECT count(*) FROM sqlite_master').fetchone()[0]:
+                    raise ValueError(f"{path} has schema version {found}, this code reads version {SCHEMA_VERSION}; "
+                                     f"export the entities to a new file (python sqlite_store.py --db NEW_FILE)")
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        # Readers do not block the writer exporting a new data version
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            # A slot is reserved before connecting, so concurrent callers never open more than `size`,
+            # and given back when the connection cannot be opened
+            with self._lock:
+                create = self._created < self.size
+                self._created += create
+            if not create:
+                conn = self._idle.get()
+            else:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+        try:
+            yield conn
+        finally:
+            if self.closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def pool(path):
+    """Return the shared connection pool of a database file"""
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ConnectionPool(path)
+        return _pools[path]
+
+
+def close_pool(path):
+    """Close every connection to a database file (connections in use are closed when returned)"""
+    with _pools_lock:
+        target = _pools.pop(path, None)
+    if target is not None:
+        target.close()
+
+
+def _floats(rows):
+    """Rows of numbers with None for NULL as a float array (NaN for NULL)"""
+    return np.array(rows, dtype=np.float64)
+
+
+def export_entity(pool, data, version, policy):
+    """Write one in-memory DashboardData into the database, replacing what the entity had before
+
+    `version` is the data version and `policy` the weighting policy it was scored
+    under. The entity keeps its id, but a SqliteDashboardData opened before holds
+    its period index and latest comparison as they were; open the entity again
+    to serve the new data.
+    """
+    matrix = data.matrix
+    n_parameters, n_periods = len(matrix.parameters), len(matrix.periods)
+    base = [data.deltas.deltas[kind] for kind in BASE_KINDS]
+    summary = compact_summary(data.df_summary)
+    columns = list(summary.columns)
+    rows = data.risk_rows()
+    numbers = summary['Unnamed: 0'].astype(str).tolist() if 'Unnamed: 0' in columns else [None] * len(rows)
+    score_rows = {name: i for i, name in enumerate(data.score_deltas.names)}
+    score_positions = {label: i for i, label in enumerate(data.score_deltas.labels)}
+
+    with pool.connection() as conn, conn:
+        existing = conn.execute('SELECT entity_id FROM entities WHERE name = ?', (data.entity,)).fetchone()
+        if existing is not None:
+            entity_id = existing[0]
+            for table in TABLES[1:]:
+                conn.execute(f'DELETE FROM {table} WHERE entity_id = ?', existing)
+            conn.execute('UPDATE entities SET version = ?, policy = ?, fingerprint = ? WHERE entity_id = ?',
+                         (version, policy, data.fingerprint, entity_id))
+        else:
+            entity_id = conn.execute('INSERT INTO entities (name, version, policy, fingerprint) VALUES (?, ?, ?, ?)',
+                                     (data.entity, version, policy, data.fingerprint)).lastrowid
+
+        conn.executemany('INSERT INTO periods VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (entity_id, p.ytd_pos, p.label, int(p.year), p.month, p.ytd_year_col, p.ytd_data_col,
+             columns[columns.index(p.score_col) - 1] if p.score_col else None, p.score_col, p.weighted_col,
+             p.classification_col)
+            for p in data.periods.periods
+        ])
+        conn.executemany('INSERT INTO parameters VALUES (?, ?, ?)',
+                         [(entity_id, i, name) for i, name in enumerate(matrix.parameters)])
+        # One row per cell, parameter-major like the primary key; NaN is stored as NULL
+        arrays = [matrix.values] + base
+        parameter_idx, period_idx = np.divmod(np.arange(n_parameters * n_periods), n_periods)
+        cells = np.column_stack([array.reshape(-1).astype(np.float64) for array in arrays]).tolist()
+        conn.executemany('INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?)', (
+            (entity_id, int(i), int(t), *values) for i, t, values in zip(parameter_idx, period_idx, cells)
+        ))
+
+        conn.executemany('INSERT INTO summary_rows VALUES (?, ?, ?, ?)',
+                         [(entity_id, i, name, number) for i, (name, number) in enumerate(zip(rows, numbers))])
+        scored = []
+        for period in data.periods.periods:
+            if period.score_col is None:
+                continue
+            scores = summary[period.score_col].tolist()
+            weighted = summary[period.weighted_col].tolist()
+            classes = summary[period.classification_col].tolist()
+            pos = score_positions.get(period.label)
+            for i, name in enumerate(rows):
+                score_row = score_rows.get(name)
+                deltas = [float(data.score_deltas.deltas[kind][score_row, pos])
+                          if score_row is not None and pos is not None else None for kind in BASE_KINDS]
+                scored.append((entity_id, period.ytd_pos, i, scores[i], weighted[i], int(classes[i]), *deltas))
+        conn.executemany('INSERT INTO summary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', scored)
+
+
+def stored_entities(pool):
+    """Return {entity name: (data version, weighting policy)} of every stored entity"""
+    with pool.connection() as conn:
+        return {name: (version, policy) for name, version, policy in
+                conn.execute('SELECT name, version, policy FROM entities').fetchall()}
+
+
+def _entity_row(conn, entity):
+    row = conn.execute('SELECT entity_id, version, fingerprint FROM entities WHERE name = ?', (entity,)).fetchone()
+    if row is None:
+        raise KeyError(f"Entity {entity!r} is not stored")
+    return row
+
+
+def open_entity(pool, entity):
+    """Return a stored entity as SqliteDashboardData"""
+    with pool.connection() as conn:
+        entity_id, version, fingerprint = _entity_row(conn, entity)
+    return SqliteDashboardData(pool, entity, entity_id, version, fingerprint)
+
+
+def load_frames(pool, entity):
+    """Read a stored entity back whole as (ParameterMatrix, compact df_summary, version, fingerprint)"""
+    with pool.connection() as conn:
+        entity_id, version, fingerprint = _entity_row(conn, entity)
+        periods = conn.execute(
+            'SELECT period_pos, label, year, month, ytd_year_col, ytd_data_col, summary_year_col, score_col, '
+            'weighted_col, classification_col FROM periods WHERE entity_id = ? ORDER BY period_pos',
+            (entity_id,)).fetchall()
+        parameters = [row[0] for row in conn.execute(
+            'SELECT name FROM parameters WHERE entity_id = ? ORDER BY parameter_id', (entity_id,))]
+        cells = conn.execute('SELECT parameter_id, period_pos, value FROM cells WHERE entity_id = ?',
+                             (entity_id,)).fetchall()
+        rows = conn.execute('SELECT name, number FROM summary_rows WHERE entity_id = ? ORDER BY row_pos',
+                            (entity_id,)).fetchall()
+        scores = conn.execute('SELECT period_pos, row_pos, score, weighted, classification FROM summary '
+                              'WHERE entity_id = ?', (entity_id,)).fetchall()
+
+    values = np.full((len(parameters), len(periods)), np.nan)
+    if cells:
+        index = np.array([cell[:2] for cell in cells], dtype=np.intp)
+        values[index[:, 0], index[:, 1]] = _floats([cell[2] for cell in cells])
+    header = pd.DataFrame([{'label': p[1], 'year': p[2], 'month': p[3], 'year_col': p[4], 'data_col': p[5]}
+                           for p in periods], columns=['label', 'year', 'month', 'year_col', 'data_col'])
+
+    # (period, row) -> score, weighted, classification; laid out again as the summary's column groups
+    blocks = {}
+    for period_pos, row_pos, score, weighted, classification in scores:
+        blocks.setdefault(period_pos, [(np.nan, np.nan, NO_BAND)] * len(rows))[row_pos] = (score, weighted, classification)
+    summary = {'Unnamed: 0': [row[1] or '' for row in rows], 'Jenis Risiko': [row[0] for row in rows]}
+    for period_pos, label, year, month, _, _, year_col, score_col, weighted_col, class_col in periods:
+        if score_col is None:
+            continue
+        block = blocks.get(period_pos, [(np.nan, np.nan, NO_BAND)] * len(rows))
+        summary[year_col] = np.full(len(rows), year, dtype=np.int16)
+        summary[score_col] = _floats([cell[0] for cell in block])
+        summary[weighted_col] = _floats([cell[1] for cell in block])
+        summary[class_col] = np.array([cell[2] for cell in block], dtype=np.int8)
+    return ParameterMatrix(parameters, values, header), compact_summary(pd.DataFrame(summary)), version, fingerprint
+
+
+class SqliteSeries:
+    """SeriesStore interface answered with indexed queries"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def _ordered(self, names, found):
+        missing = [name for name in names if name not in found]
+        if missing:
+            raise KeyError(f"Unknown parameter: {missing[0]!r}")
+        return [found[name] for name in names]
+
+    def window(self, names, period_pos, window=None):
+        """Return (period labels, parameters x periods values) of the `window` periods ending at period_pos"""
+        window = TREND_WINDOW if window is None else window
+        names = list(names)
+        start = max(0, period_pos - window + 1)
+        found = {name: np.full(period_pos + 1 - start, np.nan) for name in self.data.known_parameters(names)}
+        for name, pos, value in self.data.query(CELLS_BETWEEN, (start, period_pos, self.data.entity_id,
+                                                                json.dumps(names))):
+            found[name][pos - start] = np.nan if value is None else value
+        values = np.vstack(self._ordered(names, found)) if names else np.empty((0, period_pos + 1 - start))
+        values.flags.writeable = False
+        return self.data.periods.labels[start:period_pos + 1], values
+
+    def series(self, name, period_pos, window=None):
+        labels, values = self.window([name], period_pos, window)
+        return labels, values[0]
+
+    def cross_section(self, names, period_pos):
+        """Return the values of several parameters at one period"""
+        names = list(names)
+        found = {row[0]: row[1] for row in self.data.cells_at(names, period_pos)}
+        for name in self.data.known_parameters([name for name in names if name not in found]):
+            found[name] = None
+        values = _floats(self._ordered(names, found))
+        values.flags.writeable = False
+        return values
+
+
+class SqliteDeltas:
+    """DeltaTable interface over the stored mom / yoy / rolling_mean columns"""
+
+    def __init__(self, data, summary=False):
+        self.data = data
+        self.summary = summary
+
+    def take_all(self, names, label):
+        """Return a kinds x rows array of every delta kind (in KINDS order), NaN for unknown rows or periods"""
+        names = list(names)
+        period = self.data.periods.for_label(label)
+        stored = np.full((len(names), 1 + len(BASE_KINDS)), np.nan)
+        if period is not None:
+            if self.summary:
+                # name, score, weighted, mom, yoy, rolling_mean -> score and the base deltas
+                found = {row[0]: (row[1],) + row[3:] for row in self.data.summary_at(period)}
+            else:
+                found = {row[0]: row[1:] for row in self.data.cells_at(names, period.ytd_pos)}
+            for i, name in enumerate(names):
+                if name in found:
+                    stored[i] = _floats([found[name]])[0]
+        values = stored[:, 0]
+        base = {kind: stored[:, 1 + i] for i, kind in enumerate(BASE_KINDS)}
+        return np.vstack([derive(kind, values, base) for kind in KINDS])
+
+    def take(self, names, label, kind='mom'):
+        return self.take_all(names, label)[KINDS.index(kind)]
+
+
+class SqliteDashboardData:
+    """One stored entity behind the DashboardData interface the dashboard sections use
+
+    Only the period index, the latest comparison table and the alert rules'
+    parameters are held; everything else is queried when a view asks for it.
+    """
+
+    def __init__(self, pool, entity, entity_id, version, fingerprint):
+        self.pool = pool
+        self.entity = entity
+        self.entity_id = entity_id
+        self.version = version
+        self.fingerprint = fingerprint
+        self.periods = PeriodLookup.from_periods(
+            Period(*row) for row in self.query(
+                'SELECT label, year, month, period_pos, ytd_year_col, ytd_data_col, score_col, weighted_col, '
+                'classification_col FROM periods WHERE entity_id = ? ORDER BY period_pos', (entity_id,))
+        )
+        self._rows = [row[0] for row in self.query(
+            'SELECT name FROM summary_rows WHERE entity_id = ? ORDER BY row_pos', (entity_id,))]
+        self.series = SqliteSeries(self)
+        self.deltas = SqliteDeltas(self)
+        self.score_deltas = SqliteDeltas(self, summary=True)
+        latest = self.periods.latest_scored
+        self.latest_col_ytd_idx = latest.ytd_year_col if latest is not None else None
+        self.df_summary_present = self._comparison(latest) if latest is not None else None
+        self.alerts = self._alerts()
+
+    def query(self, sql, params):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def known_parameters(self, names):
+        return [row[0] for row in self.query(KNOWN_PARAMETERS, (self.entity_id, json.dumps(list(names))))]
+
+    def cells_at(self, names, period_pos):
+        return self.query(CELLS_AT, (period_pos, self.entity_id, json.dumps(list(names))))
+
+    def summary_at(self, period):
+        return self.query(SUMMARY_AT, (period.ytd_pos, self.entity_id))
+
+    def _alerts(self):
+        """Alert table over a small matrix of just the rule parameters, all periods"""
+        names = self.known_parameters({rule.parameter for rule in alerts.RULES})
+        labels = self.periods.labels
+        values = (self.series.window(names, len(labels) - 1, len(labels))[1] if names and labels
+                  else np.empty((len(names), len(labels))))
+        return alerts.AlertTable(ParameterMatrix(names, values, period_header(labels)))
+
+    def risk_rows(self):
+        return list(self._rows)
+
+    def period_summary(self, period):
+        rows = self.summary_at(period)
+        return pd.DataFrame({
+            'Jenis Risiko': [row[0] for row in rows],
+            'score': _floats([row[1] for row in rows]),
+            'weighted': _floats([row[2] for row in rows]),
+        })
+
+    def _comparison(self, period):
+        previous = self.periods.previous(period)
+        present = _floats([row[1] for row in self.summary_at(period)])
+        if previous is not None and previous.score_col:
+            previous_scores = _floats([row[1] for row in self.summary_at(previous)])
+        else:
+            previous_scores = '-'
+        return pd.DataFrame({'Kategori Risiko': self._rows, 'previous_month': previous_scores,
+                             'present_month': present})
+
+    def summary_comparison(self, period):
+        """Return the Kategori Risiko / previous_month / present_month table of a period (two score columns)"""
+        if period is self.periods.latest_scored:
+            return self.df_summary_present
+        return self._comparison(period)
+
+    def memory_bytes(self):
+        return (int(self.df_summary_present.memory_usage(deep=True).sum()) if self.df_summary_present is not None
+                else 0) + self.alerts.matrix.values.nbytes
+
+
+def main(argv=None):
+    import data_store
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.environ.get('RISK_SQLITE_PATH', 'risk.sqlite'), help='database file')
+    parser.add_argument('--workbook', action='append', default=[], help='Data_YTD / Summary workbook to export too')
+    args = parser.parse_args(argv)
+
+    # Build in memory here and write every known entity
+    data_store.SQLITE_PATH = None
+    for path in args.workbook:
+        data_store.load_workbook_data(path)
+    target = pool(args.db)
+    for entity in data_store.list_entities():
+        data = data_store.get_dashboard_data(entity)
+        export_entity(target, data, data.version, data_store.scoring_policy())
+        print(f"{entity}: {len(data.matrix.parameters)} parameters x {len(data.periods)} periods")
+    print(f"Exported to {args.db}")
+
+
+if __name__ == '__main__':
+    main()
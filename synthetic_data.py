@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+import data_store
+import fixed_data
+from data_model import (FULL_MONTH_NAMES, ParameterMatrix, matrix_from_ytd, month_labels, period_header, period_sort_key,
+                        summary_columns)
+from scoring import COMPOSITE_ROW, CompositeEngine
+
+
+def trailing_months(n_months, last=fixed_data.LAST_MONTH):
+    """Return the `n_months` consecutive 'Mon-YYYY' labels ending at `last`"""
+    year, month = period_sort_key(last)
+    first = year * 12 + month - (n_months - 1)
+    first_label = f"{list(FULL_MONTH_NAMES)[first % 12]}-{first // 12}"
+    return month_labels(first_label, last)
+
+
+_base = None
+
+
+def _base_frames():
+    """Parameter names and summary rows of the fixed data, so every dashboard lookup resolves"""
+    global _base
+    if _base is None:
+        df_ytd, df_summary = fixed_data.initialize_fixed_data()[:2]
+        _base = matrix_from_ytd(df_ytd).parameters, df_summary['Jenis Risiko'].astype(str).tolist()
+    return _base
+
+
+def synthetic_matrix(n_parameters, months, rng):
+    """Return a ParameterMatrix with the dashboard's parameters first, then generated ones"""
+    base_parameters, _ = _base_frames()
+    parameters = list(base_parameters[:n_parameters])
+    parameters += [f'Parameter {i}' for i in range(len(parameters), n_parameters)]
+
+    # Slowly drifting positive series, one row per parameter
+    level = rng.lognormal(mean=5, sigma=1.5, size=(n_parameters, 1))
+    drift = rng.normal(1.0, 0.02, size=(n_parameters, len(months))).cumprod(axis=1)
+    return ParameterMatrix(parameters, level * drift, period_header(months))
+
+
+def synthetic_summary(months, rng):
+    """Return a df_summary with random category scores for every month"""
+    _, rows = _base_frames()
+    categories = [row for row in rows if row not in ('', COMPOSITE_ROW)]
+    engine = CompositeEngine(categories, rng.uniform(1.0, 5.0, size=(len(categories), len(months))).round(2))
+    score_block, weighted_block, class_block = engine.summary_blocks(rows)
+
+    summary_data = {'Unnamed: 0': [''] * len(rows), 'Jenis Risiko': rows}
+    for month_idx, (year_col, score_col, weighted_col, class_col) in enumerate(summary_columns(months)):
+        summary_data[year_col] = [int(months[month_idx].split('-')[1])] * len(rows)
+        summary_data[score_col] = score_block[:, month_idx].tolist()
+        summary_data[weighted_col] = weighted_block[:, month_idx].tolist()
+        summary_data[class_col] = class_block[:, month_idx].tolist()
+    return pd.DataFrame(summary_data)
+
+
+def synthetic_entity(name, n_parameters=1000, n_months=240, seed=0):
+    """Return DashboardData for a generated entity of the given size (deterministic per seed)"""
+    rng = np.random.default_rng(seed)
+    months = trailing_months(n_months)
+    matrix = synthetic_matrix(n_parameters, months, rng)
+    df_summary = synthetic_summary(months, rng)
+    return data_store.DashboardData(matrix, df_summary, version=f'synthetic-{n_parameters}x{n_months}-{seed}',
+                                    entity=name)
+
+
+def register_synthetic_entities(n_entities, n_parameters=1000, n_months=240):
+    """Generate entities and register them with the data store; returns their names"""
+    names = []
+    for i in range(n_entities):
+        data = synthetic_entity(f'Synthetic {i + 1:03d}', n_parameters, n_months, seed=i)
+        names.append(data_store.add_dashboard_data(data))
+    return names
@@ -0,0 +1,30 @@
+import numpy as np
+
+from alerts import AlertTable, Rule
+from data_model import ParameterMatrix, month_labels, period_header
+
+RULES = [
+    Rule('RBC', '<', 120.0, 'critical', 'RBC below the OJK minimum of 120%'),
+    Rule('Jumlah Fraud', '>', 0.0, 'warning', 'Fraud cases reported'),
+]
+
+
+def test_append_period_matches_a_rebuild():
+    labels = month_labels('Jan-2020', 'Dec-2024')
+    rng = np.random.default_rng(0)
+    values = np.vstack([rng.uniform(100, 140, len(labels)), rng.integers(0, 2, len(labels)).astype(float)])
+    matrix = ParameterMatrix(['RBC', 'Jumlah Fraud'], values[:, :3], period_header(labels[:3]))
+    table = AlertTable(matrix, RULES)
+
+    buffers = set()
+    for t in range(3, len(labels)):
+        matrix.append_period(period_header(labels[:t + 1]).iloc[-1].to_dict(), values[:, t])
+        table.append_period()
+        buffers.add(id(table._buffer))
+
+    rebuilt = AlertTable(ParameterMatrix(['RBC', 'Jumlah Fraud'], values, period_header(labels)), RULES)
+    np.testing.assert_array_equal(table.breaches, rebuilt.breaches)
+    assert table.periods == labels
+    assert not table.breaches.flags.writeable
+    # Storage doubles when it fills up instead of being copied on every append
+    assert len(buffers) <= 4
@@ -0,0 +1,67 @@
+import os
+from collections import OrderedDict
+
+import pytest
+
+import batch_report
+import data_store
+import workbook_cache
+
+LABELS = ['Jun-2025', 'Jul-2025', 'Aug-2025']
+
+
+@pytest.fixture(autouse=True)
+def registry(tmp_path, monkeypatch):
+    """Only the fixed data, snapshots under tmp_path; worker processes are forked and inherit this"""
+    monkeypatch.setattr(workbook_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(data_store, 'SQLITE_PATH', None)
+    monkeypatch.setattr(data_store, '_partitions', OrderedDict())
+    monkeypatch.setattr(data_store, '_entities', {data_store.DEFAULT_ENTITY: ('fixed', None)})
+
+
+def run(output, **kwargs):
+    return batch_report.run([data_store.DEFAULT_ENTITY], output, 'Jun-2025', 'Aug-2025', workers=1,
+                            plotlyjs='cdn', log=lambda message: None, **kwargs)
+
+
+def pages(output):
+    return sorted(os.listdir(os.path.join(output, data_store.DEFAULT_ENTITY)))
+
+
+def test_reruns_render_only_changed_periods(tmp_path):
+    output = str(tmp_path / 'reports')
+    assert run(output) == {'rendered': 3, 'skipped': 0, 'failed': 0}
+    assert pages(output) == sorted(f'{label}.html' for label in LABELS)
+    manifest = batch_report.load_manifest(output)
+    assert sorted(manifest[data_store.DEFAULT_ENTITY]) == sorted(LABELS)
+
+    assert run(output) == {'rendered': 0, 'skipped': 3, 'failed': 0}
+
+    # Jul-2025's scores are shown on its own page and as the previous month on Aug-2025's
+    data = data_store.get_dashboard_data()
+    data_store.set_period_scores(data.entity, 'Jul-2025', {data.scoring.categories[0]: 5.0})
+    assert run(output) == {'rendered': 2, 'skipped': 1, 'failed': 0}
+    changed = batch_report.load_manifest(output)[data_store.DEFAULT_ENTITY]
+    assert changed['Jun-2025'] == manifest[data_store.DEFAULT_ENTITY]['Jun-2025']
+    assert changed['Jul-2025'] != manifest[data_store.DEFAULT_ENTITY]['Jul-2025']
+
+    # A page missing from the output is rendered again even when its inputs did not change
+    os.remove(batch_report.page_path(output, data_store.DEFAULT_ENTITY, 'Jun-2025'))
+    assert run(output) == {'rendered': 1, 'skipped': 2, 'failed': 0}
+
+
+def test_failed_renders_keep_the_previous_pages(tmp_path, monkeypatch):
+    output = str(tmp_path / 'reports')
+    run(output)
+    path = batch_report.page_path(output, data_store.DEFAULT_ENTITY, 'Aug-2025')
+    with open(path, encoding='utf-8') as f:
+        page = f.read()
+
+    def fail(data, period, plotlyjs='inline'):
+        raise RuntimeError('render failed')
+
+    monkeypatch.setattr(batch_report, 'render_page', fail)
+    assert run(output, force=True) == {'rendered': 0, 'skipped': 0, 'failed': 3}
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == page
+    assert pages(output) == sorted(f'{label}.html' for label in LABELS)
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+import alerts
+import fixed_data
+from data_model import period_header, summary_columns
+from data_store import DashboardData
+from deltas import DeltaTable
+from scoring import COMPOSITE_ROW
+
+
+def build():
+    return DashboardData.from_frames(*fixed_data.initialize_fixed_data()[:2], version='test')
+
+
+def category_scores(data, value):
+    return {category: value for category in data.scoring.categories}
+
+
+def assert_same_deltas(table, names, labels, values):
+    """A table updated in place holds what a rebuild over the same history would"""
+    rebuilt = DeltaTable(names, labels, values)
+    assert table.names == rebuilt.names
+    assert table.labels == rebuilt.labels
+    np.testing.assert_array_equal(table.values, rebuilt.values)
+    for kind, array in rebuilt.deltas.items():
+        np.testing.assert_allclose(table.deltas[kind], array, equal_nan=True, err_msg=kind)
+
+
+def assert_score_deltas(data):
+    engine = data.scoring
+    assert_same_deltas(data.score_deltas, engine.categories + [COMPOSITE_ROW],
+                       [period.label for period in data.periods.periods if period.score_col is not None],
+                       np.vstack([engine.scores, engine.composite]))
+
+
+def test_append_period_matches_a_rebuild():
+    data = build()
+    fingerprint = data.fingerprint
+    # Sep-2025 and Oct-2025 repeat month names already in the history, Jan-2026 starts a new year
+    for i, label in enumerate(['Sep-2025', 'Oct-2025', 'Nov-2025', 'Dec-2025', 'Jan-2026']):
+        data.append_period(label, {'RBC': 150.0 + i, 'Jumlah Aset': 1000.0 * (i + 1)},
+                           category_scores(data, 2.0 + i / 10))
+
+    labels = data.periods.labels
+    assert labels[-5:] == ['Sep-2025', 'Oct-2025', 'Nov-2025', 'Dec-2025', 'Jan-2026']
+    assert data.matrix.header.astype(str).equals(period_header(labels).astype(str))
+    latest = data.periods.latest
+    assert (latest.ytd_year_col, latest.score_col, latest.weighted_col, latest.classification_col) == (
+        period_header(labels)['year_col'].iloc[-1], *summary_columns(labels)[-1][1:])
+    assert data.matrix.get('RBC', latest.ytd_pos) == 154.0
+    assert np.isnan(data.matrix.get('Jumlah Polis', latest.ytd_pos))
+
+    assert_same_deltas(data.deltas, data.matrix.parameters, labels, data.matrix.values)
+    assert_score_deltas(data)
+    assert data.deltas.get('RBC', 'Jan-2026')['mom'] == pytest.approx(1.0)
+
+    rebuilt_alerts = alerts.AlertTable(data.matrix)
+    np.testing.assert_array_equal(data.alerts.breaches, rebuilt_alerts.breaches)
+    assert data.alerts.periods == labels
+
+    assert data.fingerprint != fingerprint
+    assert data.df_summary_present['present_month'].iloc[0] == pytest.approx(2.4)
+
+
+def test_append_period_fingerprint_is_deterministic():
+    first, second = build(), build()
+    for data in (first, second):
+        data.append_period('Sep-2025', {'RBC': 110.0}, category_scores(data, 3.0))
+    assert first.fingerprint == second.fingerprint
+
+    other = build()
+    other.append_period('Sep-2025', {'RBC': 111.0}, category_scores(other, 3.0))
+    assert other.fingerprint != first.fingerprint
+
+
+def test_append_period_checks_new_alerts():
+    data = build()
+    data.append_period('Sep-2025', {'RBC': 110.0, 'Jumlah Fraud': 0.0}, category_scores(data, 3.0))
+    assert data.alerts.counts() == {'critical': 1, 'warning': 0}
+    frame = data.alerts.to_frame(data.periods.latest.ytd_pos)
+    assert frame[['Period', 'Parameter', 'Value']].values.tolist() == [['Sep-2025', 'RBC', 110.0]]
+
+
+def test_append_period_publishes_the_period_last():
+    data = build()
+    lookup = data.periods
+    latest = data.periods.latest
+    published = []
+
+    class Watched(type(data)):
+        def __setattr__(self, name, value):
+            if name == 'periods':
+                # Every table already has the new period when the lookup that resolves it is swapped in
+                published.append((data.matrix.periods[-1], data.deltas.labels[-1], value.latest.score_col in
+                                  data.df_summary.columns, data.df_summary_present['present_month'].iloc[0]))
+            super().__setattr__(name, value)
+
+    data.__class__ = Watched
+    data.append_period('Sep-2025', {'RBC': 110.0}, category_scores(data, 2.5))
+
+    assert published == [('Sep-2025', 'Sep-2025', True, 2.5)]
+    # The lookup sessions were holding is left as it was
+    assert lookup.latest is latest and lookup.for_label('Sep-2025') is None
+    assert data.summary_comparison(latest)['present_month'].iloc[0] != 2.5
+
+
+def test_append_period_rejects_earlier_months():
+    data = build()
+    with pytest.raises(ValueError):
+        data.append_period('Aug-2025', {}, {})
+
+
+def test_rescore():
+    data = build()
+    fingerprint = data.fingerprint
+    composite = data.scoring.composite.copy()
+    category = data.scoring.categories[0]
+
+    data.rescore({category: 5.0})
+
+    assert not np.allclose(data.scoring.composite, composite)
+    assert data.fingerprint != fingerprint
+    assert_score_deltas(data)
+    latest = data.periods.latest
+    assert data.df_summary_present['present_month'].iloc[10] == pytest.approx(data.scoring.composite[-1])
+    assert data.score_deltas.get(COMPOSITE_ROW, latest.label)['mom'] == pytest.approx(
+        data.scoring.composite[-1] - data.scoring.composite[-2])
+
+    # Going back to equal weights restores the scores
+    data.rescore({})
+    np.testing.assert_allclose(data.scoring.composite, composite)
+
+
+def test_set_period_scores_recomputes_one_period():
+    data = build()
+    fingerprint = data.fingerprint
+    composite = data.scoring.composite.copy()
+    category = data.scoring.categories[0]
+    period = data.periods.for_label('Mar-2025')
+    pos = period.ytd_pos
+
+    data.set_period_scores('Mar-2025', {category: 5.0})
+
+    row = data.risk_rows().index(category)
+    assert float(data.df_summary[period.score_col].iloc[row]) == 5.0
+    changed = ~np.isclose(data.scoring.composite, composite)
+    assert changed.tolist() == [i == pos for i in range(len(composite))]
+    assert_score_deltas(data)
+    # The corrected period and the one after it both compare against the new score
+    assert data.score_deltas.get(category, 'Mar-2025')['mom'] == pytest.approx(5.0 - data.scoring.scores[0, pos - 1])
+    assert data.score_deltas.get(category, 'Apr-2025')['mom'] == pytest.approx(data.scoring.scores[0, pos + 1] - 5.0)
+    assert data.fingerprint != fingerprint
+
+
+def test_set_period_scores_of_the_latest_period_updates_the_comparison():
+    data = build()
+    category = data.scoring.categories[0]
+    data.set_period_scores(data.periods.latest.label, {category: 1.0})
+    assert data.df_summary_present['present_month'].iloc[data.risk_rows().index(category)] == 1.0
+
+
+def test_set_period_scores_rejects_unknown_periods():
+    data = build()
+    with pytest.raises(KeyError):
+        data.set_period_scores('Jan-1999', {})
@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+import pytest
+
+import data_store
+import synthetic_data
+import workbook_cache
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """An empty partition LRU and entity registry holding only the fixed data, snapshots under tmp_path"""
+    monkeypatch.setattr(workbook_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(data_store, 'SQLITE_PATH', None)
+    monkeypatch.setattr(data_store, '_partitions', OrderedDict())
+    monkeypatch.setattr(data_store, '_entities', {data_store.DEFAULT_ENTITY: ('fixed', None)})
+    monkeypatch.setattr(data_store, 'MAX_PARTITIONS', 1)
+
+
+def test_memory_entities_are_never_evicted(registry):
+    names = synthetic_data.register_synthetic_entities(3, n_parameters=20, n_months=6)
+    fixed = data_store.get_dashboard_data()
+
+    for name in names:
+        assert data_store.get_dashboard_data(name).entity == name
+    assert data_store.get_dashboard_data() is fixed
+    assert len(data_store._partitions) == 4
+
+
+def test_reloadable_entities_are_evicted_beyond_the_limit(registry):
+    fixed = data_store.get_dashboard_data()
+    data_store.register_entity('Other', 'fixed', None)
+    data_store.get_dashboard_data('Other')
+
+    assert list(data_store._partitions) == [('Other', data_store.source_version())]
+    assert data_store.get_dashboard_data() is not fixed
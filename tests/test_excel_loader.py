@@ -0,0 +1,96 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import excel_loader
+import fixed_data
+from data_model import matrix_from_ytd
+
+
+def excel_header(columns):
+    """Header cells as typed in Excel: no 'Unnamed: N' placeholders and no '.N' suffixes on repeats"""
+    return [None if str(col).startswith('Unnamed: ') else re.sub(r'\.\d+$', '', str(col)) for col in columns]
+
+
+def write_workbook(path, df_ytd, df_summary):
+    openpyxl = pytest.importorskip('openpyxl')
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, frame in ((excel_loader.YTD_SHEET, df_ytd), (excel_loader.SUMMARY_SHEET, df_summary)):
+        ws = wb.create_sheet(name)
+        ws.append(excel_header(frame.columns))
+        for row in frame.itertuples(index=False):
+            ws.append([None if isinstance(value, float) and np.isnan(value) else value for value in row])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def fixed_frames():
+    df_ytd, df_summary = fixed_data.initialize_fixed_data()[:2]
+    return df_ytd, df_summary
+
+
+def test_read_workbook_matches_the_fixed_data(tmp_path, fixed_frames):
+    df_ytd, df_summary = fixed_frames
+    path = write_workbook(str(tmp_path / 'fixed.xlsx'), df_ytd, df_summary)
+
+    matrix, summary = excel_loader.read_workbook(path)
+
+    expected = matrix_from_ytd(df_ytd)
+    assert matrix.parameters == expected.parameters
+    np.testing.assert_array_equal(matrix.values, expected.values)
+    assert matrix.header.astype(str).equals(expected.header.astype(str))
+    # Aug-2024 and Aug-2025 share a month name; the second gets pandas' '.1' suffix
+    assert list(summary.columns) == list(df_summary.columns)
+    assert 'August-score.1' in summary.columns
+    for column in df_summary.columns:
+        # Excel keeps 3.0 as 3, so numbers are compared as numbers and only text as text
+        read = pd.to_numeric(summary[column], errors='coerce')
+        written = pd.to_numeric(df_summary[column], errors='coerce')
+        np.testing.assert_array_equal(read.to_numpy(dtype=float), written.to_numpy(dtype=float), err_msg=column)
+        text = written.isna()
+        assert summary[column][text].astype(str).tolist() == df_summary[column][text].astype(str).tolist(), column
+
+
+def test_dashes_and_text_read_as_nan(tmp_path, fixed_frames):
+    df_ytd, df_summary = fixed_frames
+    df_ytd = df_ytd.copy()
+    data_col = df_ytd.columns[3]
+    df_ytd[data_col] = df_ytd[data_col].astype(object)
+    df_ytd.loc[1, data_col] = '-'
+    df_ytd.loc[2, data_col] = 'n/a'
+    df_ytd.loc[3, data_col] = '1,234.5'
+    path = write_workbook(str(tmp_path / 'dashes.xlsx'), df_ytd, df_summary)
+
+    matrix, _ = excel_loader.read_workbook(path)
+
+    assert np.isnan(matrix.values[0, 0]) and np.isnan(matrix.values[1, 0])
+    assert matrix.values[2, 0] == 1234.5
+
+
+def test_progress_is_reported_while_streaming(tmp_path, fixed_frames, monkeypatch):
+    monkeypatch.setattr(excel_loader, 'PROGRESS_EVERY', 10)
+    monkeypatch.setattr(excel_loader, 'CHUNK_ROWS', 16)
+    path = write_workbook(str(tmp_path / 'fixed.xlsx'), *fixed_frames)
+    calls = []
+
+    matrix, _ = excel_loader.read_workbook(path, progress=lambda fraction, message: calls.append((fraction, message)))
+
+    fractions = [fraction for fraction, _ in calls]
+    assert len(calls) > 2
+    assert fractions == sorted(fractions) and 0 < fractions[0] and fractions[-1] == 1.0
+    assert calls[0][1].startswith(f"{excel_loader.YTD_SHEET}: row 10 of ")
+    assert calls[-1][1] == "Workbook loaded"
+    # Rows spread over several chunks come back whole
+    np.testing.assert_array_equal(matrix.values, matrix_from_ytd(fixed_frames[0]).values)
+
+
+def test_missing_sheets_are_reported(tmp_path, fixed_frames):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = str(tmp_path / 'empty.xlsx')
+    openpyxl.Workbook().save(path)
+    with pytest.raises(ValueError, match="no 'Data_YTD' sheet"):
+        excel_loader.read_workbook(path)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import charts
+import figure_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    figure_cache.clear()
+    yield
+    figure_cache.clear()
+
+
+@pytest.mark.parametrize('figure', [
+    charts.gauge_figure(3.2),
+    charts.line_figure('Jumlah Aset', [f'Jan-{2000 + i}' for i in range(12)], np.linspace(1e6, 1e9, 12)),
+    charts.line_figure('Jumlah Aset', [f'Jan-{2000 + i}' for i in range(240)], np.linspace(1e6, 1e9, 240), large=True),
+    charts.portfolio_pie_figure(['Deposito', 'Obligasi', 'Saham'], [30.0, 50.0, 20.0]),
+    charts.single_pie_figure('Obligasi', 123.0),
+])
+def test_estimated_size_is_close_to_the_json_size(figure):
+    assert figure_cache.estimated_size(figure) == pytest.approx(len(figure.to_json()), rel=0.25)
+
+
+def test_a_miss_does_not_serialize_the_figure(monkeypatch):
+    figure = charts.gauge_figure(3.2)
+    monkeypatch.setattr(type(figure), 'to_json', lambda self, *args, **kwargs: pytest.fail('serialized'))
+    built = []
+
+    for _ in range(2):
+        assert figure_cache.get_figure('gauge', 'composite', 'Aug-2025', 'v1', lambda: built.append(1) or figure) is figure
+    assert built == [1]
+    assert figure_cache.stats() == {'figures': 1, 'bytes': figure_cache.estimated_size(figure)}
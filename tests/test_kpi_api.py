@@ -0,0 +1,107 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import data_store
+import kpi_api
+import workbook_cache
+
+
+@pytest.fixture(autouse=True)
+def registry(tmp_path, monkeypatch):
+    """Only the fixed data, nothing loaded yet, snapshots under tmp_path"""
+    monkeypatch.setattr(workbook_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(data_store, 'SQLITE_PATH', None)
+    monkeypatch.setattr(data_store, '_partitions', OrderedDict())
+    monkeypatch.setattr(data_store, '_entities', {data_store.DEFAULT_ENTITY: ('fixed', None)})
+    monkeypatch.setattr(kpi_api, '_responses', OrderedDict())
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), kpi_api.KpiHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, etag=None):
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers.get('ETag'), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, e.headers.get('ETag'), json.loads(body) if body else None
+
+
+def test_entities():
+    status, tag, build = kpi_api.resolve('/entities', {})
+    assert status == 200 and tag
+    assert build() == {'entities': [data_store.DEFAULT_ENTITY]}
+
+
+def test_periods():
+    status, tag, build = kpi_api.resolve('/periods', {})
+    body = build()
+    assert status == 200 and tag
+    assert body['entity'] == data_store.DEFAULT_ENTITY
+    assert body['periods'][0] == 'Aug-2024' and body['periods'][-1] == 'Aug-2025'
+
+
+def test_kpis():
+    status, tag, build = kpi_api.resolve('/kpis', {'period': ['Mar-2025']})
+    body = build()
+    assert status == 200
+    assert (body['period'], body['previous_period']) == ('Mar-2025', 'Feb-2025')
+    assert body['composite_score'] is not None
+    assert [card['title'] for card in body['financial']][0] == 'Jumlah Aset'
+    # The latest scored period by default, under another tag
+    latest_status, latest_tag, latest = kpi_api.resolve('/kpis', {})
+    assert latest_status == 200 and latest_tag != tag
+    assert latest()['period'] == 'Aug-2025'
+
+
+def test_unknown_paths_do_not_load_entity_data(monkeypatch):
+    monkeypatch.setattr(data_store, 'get_dashboard_data', lambda entity=None: pytest.fail('loaded'))
+    status, tag, build = kpi_api.resolve('/anything', {'entity': [data_store.DEFAULT_ENTITY]})
+    assert (status, tag) == (404, None)
+    assert build() == {'error': "Unknown path '/anything'"}
+
+
+@pytest.mark.parametrize('path, query, error', [
+    ('/periods', {'entity': ['Nobody']}, "Unknown entity: 'Nobody'"),
+    ('/kpis', {'entity': ['Nobody']}, "Unknown entity: 'Nobody'"),
+    ('/kpis', {'period': ['Jan-1999']}, "No scores for period 'Jan-1999'"),
+])
+def test_not_found(path, query, error):
+    status, tag, build = kpi_api.resolve(path, query)
+    assert (status, tag) == (404, None)
+    assert build() == {'error': error}
+
+
+def test_etags_answer_304_until_the_data_changes(server):
+    status, tag, body = get(f'{server}/kpis?period=Mar-2025')
+    assert status == 200 and tag and body['period'] == 'Mar-2025'
+
+    assert get(f'{server}/kpis?period=Mar-2025', tag) == (304, tag, None)
+    assert get(f'{server}/kpis?period=Mar-2025', f'"other", {tag}')[0] == 304
+    assert get(f'{server}/kpis?period=Apr-2025', tag)[0] == 200
+
+    data = data_store.get_dashboard_data()
+    data_store.set_period_scores(data.entity, 'Mar-2025', {data.scoring.categories[0]: 5.0})
+    status, new_tag, body = get(f'{server}/kpis?period=Mar-2025', tag)
+    assert status == 200 and new_tag != tag
+    assert body['categories'][0]['score'] == 5.0
+
+
+def test_errors_are_json(server):
+    assert get(f'{server}/kpis?entity=Nobody') == (404, None, {'error': "Unknown entity: 'Nobody'"})
+    assert get(f'{server}/nothing')[0] == 404
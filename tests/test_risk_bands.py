@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from risk_bands import BAND_COLORS, NO_BAND, band_ids, band_labels, band_styles, gauge_steps
+
+SCORES = [-1.0, 0.0, 1.0, 1.79, 1.7900001, 1.795, 1.8, 2.59, 2.6, 3.39, 3.4, 4.19, 4.2, 4.99, 5.0, 5.0000001, 6.0]
+
+
+def chained_style(value):
+    """The cell colouring the summary table used before the bands were vectorized"""
+    try:
+        val_float = float(value)
+        if val_float <= 1.79:
+            return 'background-color: #90d050'
+        elif val_float <= 2.59:
+            return 'background-color: #fff2cc'
+        elif val_float <= 3.39:
+            return 'background-color: #ffff00'
+        elif val_float <= 4.19:
+            return 'background-color: #ffc001'
+        elif val_float <= 5:
+            return 'background-color: #ff0000'
+        else:
+            return ''
+    except (TypeError, ValueError):
+        return ''
+
+
+@pytest.mark.parametrize('score', SCORES + [np.nan, '-', '', None, '2.5'])
+def test_band_styles_match_the_comparison_chain(score):
+    # float('nan') fails every <= and so falls through to no colour, like NaN here
+    assert band_styles(np.array([score], dtype=object))[0] == chained_style(score)
+
+
+def test_band_ids_at_the_boundaries():
+    ids = band_ids(np.array([1.79, 1.8, 2.59, 2.6, 3.39, 3.4, 4.19, 4.2, 5.0, 5.01, np.nan]))
+    assert ids.tolist() == [0, 1, 1, 2, 2, 3, 3, 4, 4, NO_BAND, NO_BAND]
+
+
+def test_band_labels():
+    assert band_labels(['1.5', '-', 4.5]).tolist() == ['Low', '-', 'High']
+    assert band_labels([np.nan], missing='').tolist() == ['']
+
+
+def test_gauge_steps_share_the_table_thresholds():
+    steps = gauge_steps()
+    assert [step['range'] for step in steps] == [[0.0, 1.79], [1.79, 2.59], [2.59, 3.39], [3.39, 4.19], [4.19, 5.0]]
+    assert [step['color'] for step in steps] == BAND_COLORS
@@ -0,0 +1,32 @@
+import numpy as np
+
+from scoring import CompositeEngine
+
+CATEGORIES = ['Risiko Kredit', 'Risiko Pasar', 'Risiko Likuiditas']
+
+
+def assert_same_engine(engine, rebuilt):
+    for name in ('scores', 'weighted', 'composite', 'composite_weighted'):
+        np.testing.assert_array_equal(getattr(engine, name), getattr(rebuilt, name), err_msg=name)
+
+
+def test_append_period_matches_a_rebuild():
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(1, 5, size=(len(CATEGORIES), 40)).round(2)
+    scores[1, 7] = np.nan
+    weights = {'Risiko Kredit': 2.0}
+    engine = CompositeEngine(CATEGORIES, scores[:, :2], weights)
+
+    buffers = set()
+    for t in range(2, 30):
+        engine.append_period(scores[:, t])
+        buffers.add(id(engine._buffer))
+    assert_same_engine(engine, CompositeEngine(CATEGORIES, scores[:, :30], weights))
+    # Storage doubles when it fills up instead of being copied on every append
+    assert len(buffers) <= 3
+
+    # A new policy re-scores into new arrays; appends after it start a new buffer from them
+    engine.set_weights({})
+    for t in range(30, 40):
+        engine.append_period(scores[:, t])
+    assert_same_engine(engine, CompositeEngine(CATEGORIES, scores, {}))
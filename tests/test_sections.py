@@ -0,0 +1,23 @@
+import numpy as np
+
+import fixed_data
+import sections
+from data_store import DashboardData
+
+
+def build():
+    return DashboardData.from_frames(*fixed_data.initialize_fixed_data()[:2], version='test')
+
+
+def test_financial_cards_scale_amounts_by_the_amount_unit(monkeypatch):
+    data = build()
+    latest = data.periods.latest
+    assert data.matrix.get('Jumlah Aset', latest.ytd_pos) == 9700.0
+
+    cards = dict(zip(sections.FINANCIAL_TITLES, sections.financial_cards(data, latest.ytd_pos)))
+    assert cards['Jumlah Aset'] == '9.7 miliar'
+    assert cards['RBC'] == '186.50%'
+
+    monkeypatch.setattr(sections, 'CARD_UNITS', np.array([1, 1, 1, 1, 1, 1]))
+    cards = dict(zip(sections.FINANCIAL_TITLES, sections.financial_cards(data, latest.ytd_pos)))
+    assert cards['Jumlah Aset'] == '9.7 rb'
@@ -0,0 +1,153 @@
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import data_store
+import fixed_data
+import scoring
+import sqlite_store
+import synthetic_data
+import workbook_cache
+from data_store import DashboardData
+
+
+def build():
+    return DashboardData.from_frames(*fixed_data.initialize_fixed_data()[:2], version='test',
+                                   entity=data_store.DEFAULT_ENTITY)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """data_store serving from a scratch SQLite file, with its own registry and partitions"""
+    path = str(tmp_path / 'risk.sqlite')
+    monkeypatch.setattr(workbook_cache, 'CACHE_DIR', str(tmp_path / 'workbooks'))
+    monkeypatch.setattr(data_store, 'SQLITE_PATH', path)
+    monkeypatch.setattr(data_store, '_partitions', OrderedDict())
+    monkeypatch.setattr(data_store, '_entities', {data_store.DEFAULT_ENTITY: ('fixed', None)})
+    monkeypatch.setattr(scoring, 'CATEGORY_WEIGHTS', {})
+    yield sqlite_store.pool(path)
+    sqlite_store.close_pool(path)
+
+
+def assert_same_scores(stored, data):
+    for period in data.periods.periods:
+        if period.score_col is not None:
+            np.testing.assert_allclose(stored.period_summary(stored.periods.for_label(period.label))['score'],
+                                       data.period_summary(period)['score'].astype(float), err_msg=period.label)
+
+
+def test_load_frames_reads_back_what_was_exported(store):
+    data = build()
+    sqlite_store.export_entity(store, data, data.version, '')
+    matrix, df_summary, version, fingerprint = sqlite_store.load_frames(store, data.entity)
+
+    np.testing.assert_array_equal(matrix.values, data.matrix.values)
+    assert matrix.header.astype(str).equals(data.matrix.header.astype(str))
+    assert list(df_summary.columns) == list(data.df_summary.columns)
+    for column in df_summary.columns:
+        assert df_summary[column].dtype == data.df_summary[column].dtype, column
+        assert df_summary[column].astype(str).equals(data.df_summary[column].astype(str)), column
+    assert (version, fingerprint) == (data.version, data.fingerprint)
+
+
+def test_append_period_and_set_period_scores_are_exported(store):
+    data = build()
+    served = data_store.get_dashboard_data()
+    assert isinstance(served, sqlite_store.SqliteDashboardData)
+    scores = {category: 3.0 for category in data.scoring.categories}
+
+    appended = data_store.append_period(data.entity, 'Sep-2025', {'RBC': 110.0}, scores)
+    data.append_period('Sep-2025', {'RBC': 110.0}, scores)
+    corrected = data_store.set_period_scores(data.entity, 'Mar-2025', {data.scoring.categories[0]: 5.0})
+    data.set_period_scores('Mar-2025', {data.scoring.categories[0]: 5.0})
+
+    assert appended.entity_id == corrected.entity_id == served.entity_id
+    assert data_store.get_dashboard_data() is corrected
+    assert corrected.periods.latest.label == 'Sep-2025'
+    assert corrected.fingerprint == data.fingerprint
+    assert_same_scores(corrected, data)
+
+
+def test_rescore_keeps_memory_entities_and_re_exports_stored_ones(store):
+    data = build()
+    data_store.get_dashboard_data()
+    scores = {category: 3.0 for category in data.scoring.categories}
+    data_store.append_period(data.entity, 'Sep-2025', {'RBC': 110.0}, scores)
+    data.append_period('Sep-2025', {'RBC': 110.0}, scores)
+    generated = synthetic_data.synthetic_entity('Generated', 50, 24)
+    data_store.add_dashboard_data(generated)
+    composite = generated.scoring.composite.copy()
+
+    weights = {data.scoring.categories[0]: 5.0}
+    data_store.rescore(weights)
+    data.rescore(weights)
+
+    assert data_store.get_dashboard_data('Generated') is generated
+    assert not np.allclose(generated.scoring.composite, composite)
+    served = data_store.get_dashboard_data()
+    assert sqlite_store.stored_entities(store)[data.entity][1] == data_store.scoring_policy()
+    assert served.periods.latest.label == 'Sep-2025'
+    assert_same_scores(served, data)
+
+
+def test_stored_entities_are_re_scored_when_next_requested(store):
+    generated = synthetic_data.synthetic_entity('Stored', 30, 18)
+    sqlite_store.export_entity(store, generated, generated.version, '')
+    assert 'Stored' in data_store.list_entities()
+
+    weights = {generated.scoring.categories[0]: 5.0}
+    data_store.rescore(weights)
+    generated.rescore(weights)
+
+    assert_same_scores(data_store.get_dashboard_data('Stored'), generated)
+    assert sqlite_store.stored_entities(store)['Stored'][1] == data_store.scoring_policy()
+
+
+def test_files_of_another_schema_version_are_refused(tmp_path):
+    path = str(tmp_path / 'old.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE entities (entity_id INTEGER PRIMARY KEY, name TEXT)')
+    conn.execute("INSERT INTO entities (name) VALUES ('Kept')")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(ValueError, match='schema version 0'):
+        sqlite_store.ConnectionPool(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT name FROM entities').fetchall() == [('Kept',)]
+    conn.close()
+
+
+def test_a_failed_connect_gives_its_slot_back(tmp_path):
+    pool = sqlite_store.ConnectionPool(str(tmp_path / 'pool.sqlite'), size=2)
+    connect = pool._connect
+
+    def fail():
+        raise sqlite3.OperationalError('unable to open database file')
+
+    with pool.connection():
+        pool._connect = fail
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+        pool._connect = connect
+        # Without the slot given back this would wait forever for the one idle connection
+        with pool.connection() as conn:
+            assert conn.execute('SELECT 1').fetchone() == (1,)
+    pool.close()
+
+
+def test_stored_entities_are_discovered_when_the_file_changes(store, monkeypatch):
+    data_store.list_entities()
+    calls = []
+    stored_entities = sqlite_store.stored_entities
+    monkeypatch.setattr(sqlite_store, 'stored_entities', lambda pool: calls.append(1) or stored_entities(pool))
+
+    data_store.list_entities()
+    assert calls == []
+    generated = synthetic_data.synthetic_entity('Stored', 30, 18)
+    sqlite_store.export_entity(store, generated, generated.version, '')
+    assert 'Stored' in data_store.list_entities()
+    assert calls == [1]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import format_percentage, format_percentages, format_value, format_values
+
+
+@pytest.mark.parametrize('value, text', [
+    (0, '0'),
+    (999, '999'),
+    # Rounds to four digits without reaching the thousands unit
+    (999.6, '1,000'),
+    (1_000, '1.0 rb'),
+    (1_500, '1.5 rb'),
+    (999_999, '1000.0 rb'),
+    (1_000_000, '1.0 jt'),
+    (9_700_000_000, '9.7 miliar'),
+    # Negative values are never scaled
+    (-5_000, '-5,000'),
+    (-2_000_000, '-2,000,000'),
+])
+def test_format_values_per_magnitude(value, text):
+    assert list(format_values([value])) == [text]
+    assert format_value(value) == text
+
+
+@pytest.mark.parametrize('value', [np.nan, None, '-', ''])
+def test_missing_values_format_as_zero(value):
+    assert list(format_values([value])) == ['0']
+    assert list(format_percentages([value])) == ['0.00%']
+    assert format_value(value) == '0'
+    assert format_percentage(value) == '0.00%'
+
+
+def test_other_text_is_shown_as_is():
+    assert list(format_values(['n/a', 1_500])) == ['n/a', '1.5 rb']
+    assert list(format_percentages(['n/a', 1.5])) == ['n/a', '150.00%']
+
+
+def test_percentages():
+    assert list(format_percentages(np.array([1.5, 0.0123, 0]))) == ['150.00%', '1.23%', '0.00%']
+
+
+def test_series_input_keeps_its_index():
+    formatted = format_values(pd.Series([1_000, '-'], index=[5, 6]))
+    assert formatted.to_dict() == {5: '1.0 rb', 6: '0'}
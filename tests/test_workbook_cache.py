@@ -0,0 +1,78 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+import data_store
+import excel_loader
+import fixed_data
+import workbook_cache
+from data_model import matrix_from_ytd
+
+pytestmark = pytest.mark.skipif(not workbook_cache.enabled(), reason='pyarrow is not installed')
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_cache, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def fixed_frames():
+    df_ytd, df_summary = fixed_data.initialize_fixed_data()[:2]
+    return matrix_from_ytd(df_ytd), df_summary
+
+
+def test_round_trip(fixed_frames):
+    matrix, df_summary = fixed_frames
+    assert workbook_cache.save('key', matrix, df_summary, extra={'fingerprint': 'abc'})
+
+    loaded, summary, extra = workbook_cache.load_with_meta('key')
+
+    assert loaded.parameters == matrix.parameters
+    np.testing.assert_array_equal(loaded.values, matrix.values)
+    assert loaded.values.flags.c_contiguous
+    assert loaded.header.astype(str).equals(matrix.header.astype(str))
+    # Score columns mixing numbers and '-' come back with both, as numbers and text
+    assert list(summary.columns) == list(df_summary.columns)
+    for column in df_summary.columns:
+        assert summary[column].tolist() == df_summary[column].tolist(), column
+    assert extra == {'fingerprint': 'abc'}
+
+
+def test_misses(cache_dir, fixed_frames):
+    assert workbook_cache.load('unknown') is None
+    workbook_cache.save('key', *fixed_frames)
+    os.remove(cache_dir / 'key' / workbook_cache.VALUES_FILE)
+    assert workbook_cache.load('key') is None
+
+
+def test_a_failed_save_leaves_nothing_behind(cache_dir, fixed_frames, monkeypatch):
+    def fail(table, path):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(workbook_cache, '_write_table', fail)
+    assert not workbook_cache.save('key', *fixed_frames)
+    assert os.listdir(cache_dir) == []
+
+
+def test_saves_publish_whole_entries(cache_dir, fixed_frames):
+    assert workbook_cache.save('key', *fixed_frames)
+    # An entry already published is kept rather than replaced under readers
+    assert not workbook_cache.save('key', *fixed_frames)
+    assert os.listdir(cache_dir) == ['key']
+    assert sorted(os.listdir(cache_dir / 'key')) == sorted(
+        [workbook_cache.VALUES_FILE, workbook_cache.SUMMARY_FILE, workbook_cache.META_FILE])
+
+
+def test_keys_change_with_the_parser_version(tmp_path, monkeypatch):
+    path = tmp_path / 'workbook.xlsx'
+    path.write_bytes(b'workbook bytes')
+    keys = data_store.workbook_key(str(path)), data_store.workbook_key(io.BytesIO(b'workbook bytes'))
+    assert keys[0] == keys[1]
+
+    monkeypatch.setattr(excel_loader, 'PARSER_VERSION', excel_loader.PARSER_VERSION + 1)
+    assert data_store.workbook_key(str(path)) != keys[0]
+    assert data_store.workbook_key(io.BytesIO(b'workbook bytes')) != keys[1]
@@ -1,29 +1,104 @@
+import sys
+
+import numpy as np
 import pandas as pd
 
+def _as_series(values):
+    """Return values as a flat Series (keeps the index of a Series input)"""
+    if isinstance(values, pd.Series):
+        return values
+    return pd.Series(np.asarray(values, dtype=object).ravel())
+
+def _to_numbers(series):
+    """Return float64 values, 0 for NaN / '-' / '' like null_value, NaN for other text"""
+    is_null = series.isna() | series.isin(['-', ''])
+    numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(is_null.to_numpy(), 0.0, numbers)
+
+def _as_output(text, series, values):
+    """Return formatted text as a Series for Series input, otherwise an object array"""
+    if isinstance(values, pd.Series):
+        return pd.Series(text, index=series.index, dtype=object)
+    return text
+
+def format_values(values):
+    """Format a Series/array of values in thousand, million or billion in one pass"""
+    series = _as_series(values)
+    vals = _to_numbers(series)
+
+    # Unit chosen with vectorized comparisons, largest unit first
+    units = [vals >= 1_000_000_000, vals >= 1_000_000, vals >= 1_000]
+    divisor = np.select(units, [1_000_000_000, 1_000_000, 1_000], 1)
+    suffix = np.select(units, [' miliar', ' jt', ' rb'], '')
+    scaled = np.char.add(np.char.mod('%.1f', vals / divisor), suffix)
+    plain = np.char.mod('%.0f', vals)
+
+    text = np.where(divisor > 1, scaled, plain).astype(object)
+    # Only plain numbers that round to 4+ digits (e.g. negatives) need thousands separators
+    for i in np.flatnonzero((divisor == 1) & (np.abs(vals) >= 999.5)):
+        text[i] = f"{vals[i]:,.0f}"
+    # Text that is not a number is shown as is
+    for i in np.flatnonzero(np.isnan(vals)):
+        text[i] = str(series.iloc[i])
+    return _as_output(text, series, values)
+
+def format_percentages(values):
+    """Convert a Series/array of ratios to percentage strings (e.g. RBC) in one pass"""
+    series = _as_series(values)
+    vals = _to_numbers(series)
+    text = np.char.add(np.char.mod('%.2f', vals * 100), '%').astype(object)
+    for i in np.flatnonzero(np.isnan(vals)):
+        text[i] = str(series.iloc[i])
+    return _as_output(text, series, values)
+
 def format_value(value):
-    """Format value to show in thousand, million or billion"""
-    try:
-        val = float(value)
-        if val >= 1_000_000_000:  # Billion
-            return f"{val / 1_000_000_000:.1f} miliar"
-        elif val >= 1_000_000:  # Million
-            return f"{val / 1_000_000:.1f} jt"
-        elif val >= 1_000:  # Thousand
-            return f"{val / 1_000:.1f} rb"
-        else:
-            return f"{val:,.0f}"
-    except:
-        return str(value)
+    """Format value to show in thousand, million or billion ('0' for NaN, None, '-' and '', like format_values)"""
+    return format_values([value])[0]
 
 def format_percentage(value):
-    """Convert value to percentage format for RBC"""
-    try:
-        return f"{float(value*100):.2f}%"
-    except:
-        return f"{value*100}%"
+    """Convert value to percentage format for RBC ('0.00%' for NaN, None, '-' and '', like format_percentages)"""
+    return format_percentages([value])[0]
+
+def format_number(value):
+    """Format a count or amount without trailing decimals when it is a whole number"""
+    val = float(value)
+    if val.is_integer():
+        return f"{val:,.0f}"
+    return f"{val:,.2f}"
 
 def null_value(value):
     """Return 0 if value is NaN or '-', otherwise return the value"""
     if pd.isna(value) or value == "-" or value == "":
         return 0
     return value
+
+def format_bytes(size):
+    """Format a byte count as B / KB / MB / GB"""
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def object_bytes(value, _seen=None):
+    """Approximate memory held by a value, following containers, frames and arrays"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(object_bytes(k, seen) + object_bytes(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(object_bytes(v, seen) for v in value)
+    return size
+
+def session_state_bytes(state):
+    """Approximate memory held by one session's st.session_state"""
+    return object_bytes({key: state[key] for key in state.keys()})
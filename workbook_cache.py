@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data_model import ParameterMatrix
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - the cache is simply disabled without pyarrow
+    pa = None
+
+# Parsed workbooks are stored as Arrow IPC files under <cache dir>/<workbook key>/
+CACHE_DIR = os.environ.get(
+    'RISK_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'workbooks')
+)
+
+VALUES_FILE = 'values.arrow'
+SUMMARY_FILE = 'summary.arrow'
+META_FILE = 'meta.json'
+
+
+def enabled():
+    """Return True when pyarrow is available for the columnar cache"""
+    return pa is not None
+
+
+def _entry_dir(key):
+    return os.path.join(CACHE_DIR, key)
+
+
+def _write_table(table, path):
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(path):
+    # Memory-mapped: numeric buffers are used in place instead of being read into memory
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _summary_to_table(df_summary):
+    """Convert df_summary to Arrow; score columns mixing floats and '-' are stored as text"""
+    arrays = {}
+    mixed = []
+    for col in df_summary.columns:
+        series = df_summary[col]
+        if series.dtype == object:
+            numeric = pd.to_numeric(series, errors='coerce')
+            is_text = numeric.isna() & series.notna()
+            if is_text.all():
+                series = series.astype(str)
+            elif is_text.any():
+                mixed.append(col)
+                series = series.astype(str)
+            else:
+                series = numeric
+        arrays[col] = pa.array(series.to_numpy())
+    return pa.table(arrays), mixed
+
+
+def _table_to_summary(table, mixed):
+    """Inverse of _summary_to_table: restore floats inside mixed text columns"""
+    df_summary = table.to_pandas()
+    for col in mixed:
+        text = df_summary[col].astype(object)
+        numeric = pd.to_numeric(text, errors='coerce')
+        df_summary[col] = numeric.astype(object).where(numeric.notna(), text)
+    return df_summary
+
+
+def save(key, matrix, df_summary, extra=None):
+    """Store a parsed workbook under its key; failures only cost the cache, never the caller
+
+    `extra` is a JSON-serializable dict kept alongside (see load_with_meta).
+    """
+    if pa is None:
+        return False
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{key}-', dir=CACHE_DIR)
+    try:
+        # The matrix is stored flat and row-major so it maps back to a C-contiguous array without copying
+        _write_table(pa.table({'values': matrix.values.reshape(-1)}), os.path.join(tmp_dir, VALUES_FILE))
+        summary_table, mixed = _summary_to_table(df_summary)
+        _write_table(summary_table, os.path.join(tmp_dir, SUMMARY_FILE))
+        meta = {
+            'key': key,
+            'parameters': matrix.parameters,
+            'header': matrix.header.to_dict(orient='list'),
+            'mixed_summary_columns': mixed,
+            'extra': extra or {},
+        }
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+        # Publish atomically so concurrent readers never see a partial entry
+        os.replace(tmp_dir, _entry_dir(key))
+        return True
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return False
+
+
+def load(key):
+    """Return (ParameterMatrix, df_summary) for a cached workbook key, or None on a miss"""
+    cached = load_with_meta(key)
+    return None if cached is None else cached[:2]
+
+
+def load_with_meta(key):
+    """Return (ParameterMatrix, df_summary, extra) for a cached key, or None on a miss"""
+    if pa is None:
+        return None
+    entry = _entry_dir(key)
+    try:
+        with open(os.path.join(entry, META_FILE)) as f:
+            meta = json.load(f)
+        values = _read_table(os.path.join(entry, VALUES_FILE)).column('values').to_numpy()
+        summary_table = _read_table(os.path.join(entry, SUMMARY_FILE))
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+
+    header = pd.DataFrame(meta['header'])
+    values = np.asarray(values, dtype=np.float64).reshape(len(meta['parameters']), len(header))
+    matrix = ParameterMatrix(meta['parameters'], values, header)
+    return matrix, _table_to_summary(summary_table, meta['mixed_summary_columns']), meta.get('extra', {})